@@ -0,0 +1,623 @@
+"""
+A local stand-in for the GitHub and Guru APIs used by GitHubPublisher.
+
+Both services are served by one HTTP server. GitHub endpoints are served under /repos,
+with the repository kept in memory as Git objects so blob SHAs match the ones computed
+by GitHubPublisher. Guru endpoints are served under /guru/api/v1 and image downloads
+under /guru/files. Every request is recorded with its endpoint, size, and the phase
+of the sync that made it. Requests to routes that aren't implemented get a 501 and
+are reported, so missing routes are easy to spot.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+def get_git_blob_sha(content: bytes) -> str:
+    """
+    Compute the SHA of a Git blob the same way Git does.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content, usedforsecurity=False).hexdigest()
+
+
+def get_object_sha(object_type: str, value) -> str:
+    """
+    Compute a stable SHA for a fake tree or commit object.
+    """
+    serialized_value = json.dumps(value, sort_keys=True).encode()
+    return hashlib.sha1(object_type.encode() + b"\0" + serialized_value, usedforsecurity=False).hexdigest()
+
+
+class RequestRecorder:
+    """
+    Record the requests made to the fake services, grouped by the phase of the sync that made them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phase = "setup"
+        self.requests = []
+
+    def set_phase(self, phase: str):
+        with self.lock:
+            self.phase = phase
+
+    def record(self, service: str, endpoint: str, status: int, request_bytes: int, response_bytes: int):
+        with self.lock:
+            self.requests.append(
+                {
+                    "phase": self.phase,
+                    "service": service,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "request_bytes": request_bytes,
+                    "response_bytes": response_bytes,
+                }
+            )
+
+    def reset(self):
+        with self.lock:
+            self.phase = "setup"
+            self.requests = []
+
+    def summarize(self) -> dict:
+        """
+        Summarize the number of requests and bytes transferred per phase and endpoint.
+        """
+        with self.lock:
+            requests = list(self.requests)
+
+        summary = defaultdict(
+            lambda: {"requests": 0, "request_bytes": 0, "response_bytes": 0, "endpoints": defaultdict(int)}
+        )
+        for request in requests:
+            for phase in (request["phase"], "total"):
+                phase_summary = summary[phase]
+                phase_summary["requests"] += 1
+                phase_summary["request_bytes"] += request["request_bytes"]
+                phase_summary["response_bytes"] += request["response_bytes"]
+                phase_summary["endpoints"][f"{request['service']} {request['endpoint']}"] += 1
+
+        return {
+            phase: {**phase_summary, "endpoints": dict(sorted(phase_summary["endpoints"].items()))}
+            for phase, phase_summary in summary.items()
+        }
+
+    def list_unhandled(self):
+        with self.lock:
+            return sorted({request["endpoint"] for request in self.requests if request["status"] == 501})
+
+
+class FakeGitHub:
+    """
+    An in-memory GitHub repository with a single branch.
+    Trees are stored as flat maps of file paths to blob SHAs and modes.
+    """
+
+    def __init__(self, repository: str, branch: str, server_url: str):
+        self.repository = repository
+        self.branch = branch
+        self.server_url = server_url
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.refs = {}
+        self.rate_limit = 5000
+        self.rate_limit_used = 0
+        self.rate_limit_reset = int(time.time()) + 3600
+
+        self.refs[f"refs/heads/{branch}"] = self.create_commit("Initial commit", self.create_tree({}), [])
+
+    def add_files(self, files: dict, message="Add files"):
+        """
+        Commit files to the branch directly, for setting up a scenario.
+        """
+        with self.lock:
+            tree = dict(self.get_head_tree())
+            for file_path, content in files.items():
+                tree[file_path] = ("100644", self.create_blob(content.encode()))
+            self.update_branch(self.create_commit(message, self.create_tree(tree), [self.get_head()]))
+
+    def create_blob(self, content: bytes) -> str:
+        sha = get_git_blob_sha(content)
+        self.blobs[sha] = content
+        return sha
+
+    def create_tree(self, tree: dict) -> str:
+        sha = get_object_sha("tree", sorted(tree.items()))
+        self.trees[sha] = tree
+        return sha
+
+    def create_commit(self, message: str, tree_sha: str, parents: list) -> str:
+        commit = {"message": message, "tree": tree_sha, "parents": parents}
+        sha = get_object_sha("commit", commit)
+        self.commits[sha] = commit
+        return sha
+
+    def get_head(self) -> str:
+        return self.refs[f"refs/heads/{self.branch}"]
+
+    def get_head_tree(self) -> dict:
+        return self.trees[self.commits[self.get_head()]["tree"]]
+
+    def update_branch(self, commit_sha: str):
+        self.refs[f"refs/heads/{self.branch}"] = commit_sha
+
+    def get_html_url(self, file_path: str, object_type="blob") -> str:
+        return f"{self.server_url}/{self.repository}/{object_type}/{self.branch}/{file_path}"
+
+    def get_rate_limit_headers(self) -> dict:
+        self.rate_limit_used += 1
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - self.rate_limit_used)),
+            "X-RateLimit-Reset": str(self.rate_limit_reset),
+            "X-RateLimit-Used": str(self.rate_limit_used),
+        }
+
+    def list_directory(self, tree: dict, directory_path: str):
+        """
+        List the files and directories directly inside a directory of a flat tree.
+        """
+        prefix = f"{directory_path}/" if directory_path else ""
+        entries = {}
+        for file_path, (mode, sha) in tree.items():
+            if not file_path.startswith(prefix):
+                continue
+            name, _, remainder = file_path[len(prefix) :].partition("/")
+            entry_path = f"{prefix}{name}"
+            if remainder:
+                entries[entry_path] = {"type": "dir", "sha": self.get_directory_sha(tree, entry_path)}
+            else:
+                entries[entry_path] = {"type": "file", "sha": sha}
+        return entries
+
+    def get_directory_sha(self, tree: dict, directory_path: str) -> str:
+        prefix = f"{directory_path}/"
+        return get_object_sha(
+            "tree",
+            [directory_path]
+            + sorted((file_path, entry) for file_path, entry in tree.items() if file_path.startswith(prefix)),
+        )
+
+    def describe_file(self, file_path: str, sha: str, include_content=False) -> dict:
+        content = self.blobs[sha]
+        description = {
+            "type": "file",
+            "name": file_path.rsplit("/", 1)[-1],
+            "path": file_path,
+            "sha": sha,
+            "size": len(content),
+            "html_url": self.get_html_url(file_path),
+        }
+        if include_content:
+            description["encoding"] = "base64"
+            description["content"] = base64.b64encode(content).decode()
+        return description
+
+    def describe_commit(self, commit_sha: str) -> dict:
+        return {"sha": commit_sha, "tree": {"sha": self.commits[commit_sha]["tree"]}}
+
+    def get_content(self, file_path: str, query: dict):
+        ref = query.get("ref", [self.branch])[0]
+        commit_sha = self.refs.get(f"refs/heads/{ref}", ref)
+        if commit_sha not in self.commits:
+            return 404, {"message": "No commit found for the ref"}
+
+        tree = self.trees[self.commits[commit_sha]["tree"]]
+        if file_path in tree:
+            return 200, self.describe_file(file_path, tree[file_path][1], include_content=True)
+
+        entries = self.list_directory(tree, file_path)
+        if not entries:
+            return 404, {"message": "Not Found"}
+
+        return 200, {
+            "type": "dir",
+            "name": file_path.rsplit("/", 1)[-1],
+            "path": file_path,
+            "sha": self.get_directory_sha(tree, file_path) if file_path else self.commits[commit_sha]["tree"],
+            "html_url": self.get_html_url(file_path, "tree"),
+            "entries": [
+                {
+                    "type": entry["type"],
+                    "name": entry_path.rsplit("/", 1)[-1],
+                    "path": entry_path,
+                    "sha": entry["sha"],
+                }
+                for entry_path, entry in sorted(entries.items())
+            ],
+        }
+
+    def put_content(self, file_path: str, data: dict):
+        tree = dict(self.get_head_tree())
+        existing_entry = tree.get(file_path)
+        if existing_entry and not data.get("sha"):
+            return 422, {"message": "Invalid request.\n\n\"sha\" wasn't supplied."}
+        if existing_entry and data.get("sha") != existing_entry[1]:
+            return 409, {"message": f"{file_path} does not match {data.get('sha')}"}
+
+        sha = self.create_blob(base64.b64decode(data["content"]))
+        tree[file_path] = ("100644", sha)
+        commit_sha = self.create_commit(data["message"], self.create_tree(tree), [self.get_head()])
+        self.update_branch(commit_sha)
+
+        return 200 if existing_entry else 201, {
+            "content": self.describe_file(file_path, sha),
+            "commit": self.describe_commit(commit_sha),
+        }
+
+    def delete_content(self, file_path: str, data: dict):
+        tree = dict(self.get_head_tree())
+        existing_entry = tree.get(file_path)
+        if existing_entry is None:
+            return 404, {"message": "Not Found"}
+        if data.get("sha") != existing_entry[1]:
+            return 409, {"message": f"{file_path} does not match {data.get('sha')}"}
+
+        del tree[file_path]
+        commit_sha = self.create_commit(data["message"], self.create_tree(tree), [self.get_head()])
+        self.update_branch(commit_sha)
+
+        return 200, {"content": None, "commit": self.describe_commit(commit_sha)}
+
+    def get_tree(self, sha: str, query: dict):
+        if sha in self.commits:
+            sha = self.commits[sha]["tree"]
+        if sha not in self.trees:
+            return 404, {"message": "Not Found"}
+
+        tree = self.trees[sha]
+        if query.get("recursive"):
+            directories = {}
+            for file_path in tree:
+                parts = file_path.split("/")[:-1]
+                for index in range(len(parts)):
+                    directory_path = "/".join(parts[: index + 1])
+                    if directory_path not in directories:
+                        directories[directory_path] = self.get_directory_sha(tree, directory_path)
+            entries = [
+                {"path": directory_path, "mode": "040000", "type": "tree", "sha": directory_sha}
+                for directory_path, directory_sha in directories.items()
+            ] + [
+                {"path": file_path, "mode": mode, "type": "blob", "sha": blob_sha, "size": len(self.blobs[blob_sha])}
+                for file_path, (mode, blob_sha) in tree.items()
+            ]
+        else:
+            entries = [
+                {
+                    "path": entry_path,
+                    "mode": "040000" if entry["type"] == "dir" else tree[entry_path][0],
+                    "type": "tree" if entry["type"] == "dir" else "blob",
+                    "sha": entry["sha"],
+                }
+                for entry_path, entry in self.list_directory(tree, "").items()
+            ]
+
+        return 200, {"sha": sha, "tree": sorted(entries, key=lambda entry: entry["path"]), "truncated": False}
+
+    def post_tree(self, data: dict):
+        base_tree = data.get("base_tree")
+        if base_tree and base_tree not in self.trees:
+            return 422, {"message": "Invalid tree info"}
+
+        tree = dict(self.trees[base_tree]) if base_tree else {}
+        for entry in data["tree"]:
+            file_path = entry["path"]
+            if "content" in entry:
+                tree[file_path] = (entry["mode"], self.create_blob(entry["content"].encode()))
+            elif entry.get("sha") is None:
+                tree.pop(file_path, None)
+                for existing_path in [existing_path for existing_path in tree if existing_path.startswith(f"{file_path}/")]:
+                    del tree[existing_path]
+            elif entry["sha"] in self.blobs:
+                tree[file_path] = (entry["mode"], entry["sha"])
+            else:
+                return 422, {"message": f"Invalid tree info: {entry['sha']} is not a blob"}
+
+        sha = self.create_tree(tree)
+        return 201, {"sha": sha, "truncated": False}
+
+    def post_blob(self, data: dict):
+        if data.get("encoding") == "base64":
+            content = base64.b64decode(data["content"])
+        else:
+            content = data["content"].encode()
+        return 201, {"sha": self.create_blob(content)}
+
+    def post_commit(self, data: dict):
+        if data["tree"] not in self.trees:
+            return 422, {"message": "Tree SHA does not exist"}
+        if any(parent not in self.commits for parent in data.get("parents", [])):
+            return 422, {"message": "Parent SHA does not exist or is not a commit object"}
+
+        commit_sha = self.create_commit(data["message"], data["tree"], data.get("parents", []))
+        return 201, {"sha": commit_sha, "tree": {"sha": data["tree"]}, "message": data["message"]}
+
+    def patch_ref(self, ref: str, data: dict):
+        if ref not in self.refs:
+            return 422, {"message": "Reference does not exist"}
+        if data["sha"] not in self.commits:
+            return 422, {"message": "Object does not exist"}
+        if not data.get("force") and self.refs[ref] not in self.get_ancestors(data["sha"]):
+            return 422, {"message": "Update is not a fast forward"}
+
+        self.refs[ref] = data["sha"]
+        return 200, {"ref": ref, "object": {"type": "commit", "sha": data["sha"]}}
+
+    def get_ancestors(self, commit_sha: str) -> set:
+        ancestors = set()
+        pending = [commit_sha]
+        while pending:
+            sha = pending.pop()
+            if sha not in ancestors:
+                ancestors.add(sha)
+                pending.extend(self.commits[sha]["parents"])
+        return ancestors
+
+    def get_branch(self, branch: str):
+        commit_sha = self.refs.get(f"refs/heads/{branch}")
+        if commit_sha is None:
+            return 404, {"message": "Branch not found"}
+        return 200, {
+            "name": branch,
+            "commit": {"sha": commit_sha, "commit": {"tree": {"sha": self.commits[commit_sha]["tree"]}}},
+        }
+
+    def get_commit_sha(self, ref: str):
+        commit_sha = self.refs.get(f"refs/heads/{ref}", ref)
+        if commit_sha not in self.commits:
+            return 404, {"message": "No commit found for SHA"}
+        return 200, commit_sha
+
+
+class FakeGuru:
+    """
+    In-memory Guru collections, folders, cards, and images, with the response shapes of the Guru API.
+    """
+
+    def __init__(self, page_size=50):
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.folders = {}
+        self.cards = {}
+        self.images = {}
+
+    def add_collection(self, collection: dict):
+        """
+        Add a collection created by one of the synthetic collection generators.
+        """
+        with self.lock:
+            self.collections[collection["collection"]["id"]] = collection["collection"]
+            self.folders.update({folder["id"]: folder for folder in collection["folders"]})
+            self.cards.update({card["id"]: card for card in collection["cards"]})
+            self.images.update(collection["images"])
+
+    def list_collection_cards(self, collection_id: str):
+        return sorted(
+            (card for card in self.cards.values() if card["collection"]["id"] == collection_id),
+            key=lambda card: card["id"],
+        )
+
+    def paginate(self, items: list, query: dict, base_url: str):
+        """
+        Split a list into pages and link to the next one, the way the Guru API does.
+        """
+        token = int(query.get("token", ["0"])[0])
+        page = items[token : token + self.page_size]
+        headers = {}
+        if token + self.page_size < len(items):
+            headers["Link"] = f"<{base_url}?token={token + self.page_size}>; rel=\"next-page\""
+        return 200, page, headers
+
+    def describe_folder(self, folder: dict) -> dict:
+        return {key: value for key, value in folder.items() if key != "itemIds"}
+
+    def get_folder_items(self, folder: dict) -> list:
+        items = []
+        for item_id in folder["itemIds"]:
+            if item_id in self.folders:
+                items.append({"type": "folder", **self.describe_folder(self.folders[item_id])})
+            elif item_id in self.cards:
+                items.append({"type": "fact", **self.cards[item_id]})
+        return items
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    """
+    Route requests to the fake GitHub and Guru services.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def handle_request(self, method: str):
+        server: FakeServiceServer = self.server
+        content_length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(content_length) if content_length else b""
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        for route_method, pattern, service, endpoint, handler in server.routes:
+            match = pattern.fullmatch(url.path)
+            if route_method == method and match:
+                data = json.loads(body) if body else {}
+                with server.github.lock, server.guru.lock:
+                    result = handler(self, *[unquote(group) for group in match.groups()], query=query, data=data)
+                break
+        else:
+            service = "guru" if url.path.startswith("/guru") else "github"
+            endpoint = f"{method} {url.path}"
+            result = (501, {"message": f"Not implemented by the fake services: {method} {url.path}"})
+
+        status, response_body, headers = (result + ({},))[:3]
+        if service == "github":
+            headers = {**headers, **server.github.get_rate_limit_headers()}
+
+        if isinstance(response_body, bytes):
+            content_type = headers.pop("Content-Type", "application/octet-stream")
+        elif isinstance(response_body, str):
+            content_type = "text/plain"
+            response_body = response_body.encode()
+        elif response_body is None:
+            content_type = None
+            response_body = b""
+        else:
+            content_type = "application/json"
+            response_body = json.dumps(response_body).encode()
+
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(response_body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response_body)
+
+        server.recorder.record(service, endpoint, status, len(body), len(response_body))
+
+    def get_image(self, card_id, filename, query, data):
+        guru: FakeGuru = self.server.guru
+        image = guru.images.get(f"{card_id}/{filename}")
+        if image is None:
+            return 404, {"message": "Not Found"}
+
+        etag = f'"{hashlib.sha1(image, usedforsecurity=False).hexdigest()}"'
+        headers = {"ETag": etag, "Last-Modified": formatdate(self.server.started_at, usegmt=True)}
+        if self.headers.get("If-None-Match") == etag:
+            return 304, None, headers
+        return 200, image, {**headers, "Content-Type": "image/png"}
+
+
+class FakeServiceServer(ThreadingHTTPServer):
+    """
+    An HTTP server for the fake GitHub and Guru services, running on a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, repository="octo-org/guru-docs", branch="main", latency=0.0):
+        super().__init__(("127.0.0.1", 0), FakeServiceHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.latency = latency
+        self.started_at = time.time()
+        self.recorder = RequestRecorder()
+        self.github = FakeGitHub(repository, branch, self.url)
+        self.guru = FakeGuru()
+        self.thread = None
+
+        github, guru = self.github, self.guru
+        repository_pattern = re.escape(repository)
+        self.routes = [
+            (method, re.compile(pattern), service, endpoint, handler)
+            for method, pattern, service, endpoint, handler in [
+                ("GET", rf"/repos/{repository_pattern}/contents/?(.*)", "github", "GET /contents",
+                 lambda request, file_path, query, data: github.get_content(file_path, query)),
+                ("PUT", rf"/repos/{repository_pattern}/contents/(.+)", "github", "PUT /contents",
+                 lambda request, file_path, query, data: github.put_content(file_path, data)),
+                ("DELETE", rf"/repos/{repository_pattern}/contents/(.+)", "github", "DELETE /contents",
+                 lambda request, file_path, query, data: github.delete_content(file_path, data)),
+                ("GET", rf"/repos/{repository_pattern}/git/trees/([0-9a-f]+)", "github", "GET /git/trees",
+                 lambda request, sha, query, data: github.get_tree(sha, query)),
+                ("POST", rf"/repos/{repository_pattern}/git/blobs", "github", "POST /git/blobs",
+                 lambda request, query, data: github.post_blob(data)),
+                ("POST", rf"/repos/{repository_pattern}/git/trees", "github", "POST /git/trees",
+                 lambda request, query, data: github.post_tree(data)),
+                ("POST", rf"/repos/{repository_pattern}/git/commits", "github", "POST /git/commits",
+                 lambda request, query, data: github.post_commit(data)),
+                ("PATCH", rf"/repos/{repository_pattern}/git/(refs/heads/.+)", "github", "PATCH /git/refs",
+                 lambda request, ref, query, data: github.patch_ref(ref, data)),
+                ("GET", rf"/repos/{repository_pattern}/branches/(.+)", "github", "GET /branches",
+                 lambda request, branch, query, data: github.get_branch(branch)),
+                ("GET", rf"/repos/{repository_pattern}/commits/(.+)", "github", "GET /commits",
+                 lambda request, ref, query, data: github.get_commit_sha(ref)),
+                ("GET", r"/guru/api/v1/collections", "guru", "GET /collections",
+                 lambda request, query, data: (200, list(guru.collections.values()))),
+                ("GET", r"/guru/api/v1/collections/([^/]+)", "guru", "GET /collections/{id}",
+                 lambda request, collection_id, query, data: (200, guru.collections[collection_id])
+                 if collection_id in guru.collections else (404, {"description": "Not Found"})),
+                ("GET", r"/guru/api/v1/search/cardmgr", "guru", "GET /search/cardmgr",
+                 lambda request, query, data: self.search_cards(query, data)),
+                ("POST", r"/guru/api/v1/search/cardmgr", "guru", "POST /search/cardmgr",
+                 lambda request, query, data: self.search_cards(query, data)),
+                ("GET", r"/guru/api/v1/cards/([^/]+)(?:/extended)?", "guru", "GET /cards/{id}",
+                 lambda request, card_id, query, data: (200, guru.cards[card_id])
+                 if card_id in guru.cards else (404, {"description": "Not Found"})),
+                ("GET", r"/guru/api/v1/folders", "guru", "GET /folders",
+                 lambda request, query, data: (200, [
+                     guru.describe_folder(folder) for folder in guru.folders.values()
+                     if not query.get("collection") or folder["collection"]["id"] in query["collection"]
+                 ])),
+                ("GET", r"/guru/api/v1/folders/([^/]+)", "guru", "GET /folders/{id}",
+                 lambda request, folder_id, query, data: (200, guru.describe_folder(guru.folders[folder_id]))
+                 if folder_id in guru.folders else (404, {"description": "Not Found"})),
+                ("GET", r"/guru/api/v1/folders/([^/]+)/items", "guru", "GET /folders/{id}/items",
+                 lambda request, folder_id, query, data: (200, guru.get_folder_items(guru.folders[folder_id]))
+                 if folder_id in guru.folders else (404, {"description": "Not Found"})),
+                ("GET", r"/guru/files/([^/]+)/([^/]+)", "guru", "GET /files",
+                 lambda request, card_id, filename, query, data: request.get_image(card_id, filename, query, data)),
+            ]
+        ]
+
+    @property
+    def guru_api_url(self) -> str:
+        return f"{self.url}/guru/api/v1"
+
+    def search_cards(self, query: dict, data: dict):
+        collection_ids = set(data.get("collectionIds") or query.get("collectionIds") or [])
+        if not collection_ids and query.get("q"):
+            # Card manager queries filter by collection with a query string like "collection:<id>"
+            collection_ids = set(re.findall(r"collection:([\w-]+)", query["q"][0]))
+
+        cards = [
+            card
+            for collection_id in sorted(collection_ids or self.guru.collections)
+            for card in self.guru.list_collection_cards(collection_id)
+        ]
+
+        # Only the last-modified expression of card manager queries is supported
+        for expression in (data.get("query") or {}).get("nestedExpressions", []):
+            if expression.get("type") == "last-modified" and expression.get("op") == "GT":
+                cards = [card for card in cards if card["lastModified"] > expression["value"]]
+
+        return self.guru.paginate(cards, query, f"{self.guru_api_url}/search/cardmgr")
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,102 @@
+"""
+Benchmark converting large, table-heavy Guru cards to Markdown.
+
+Compares the previous output (BeautifulSoup's prettify) with MarkdownConverter,
+using each HTML parser that is installed.
+
+Usage: python benchmarks/markdown_conversion.py [--tables 50] [--rows 40] [--columns 6] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from os import path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from markdown_converter import MarkdownConverter  # noqa: E402
+
+
+def generate_card_html(tables: int, rows: int, columns: int) -> str:
+    """
+    Generate the HTML of a runbook-style card with headings, paragraphs, lists, and tables.
+    """
+    sections = []
+    for table_number in range(tables):
+        header = "".join(f"<th>Column {column}</th>" for column in range(columns))
+        body = "".join(
+            "<tr>"
+            + "".join(
+                f"<td><p>Row {row}, <strong>cell</strong> {column} with <a href='https://example.com/{row}'>a link</a></p></td>"
+                for column in range(columns)
+            )
+            + "</tr>"
+            for row in range(rows)
+        )
+        sections.append(
+            f"<h2>Section {table_number}</h2>"
+            f"<p>Step {table_number} of the runbook. Run <code>deploy --env production</code> and check the output.</p>"
+            "<ul><li>First check</li><li>Second check<ul><li>Nested detail</li></ul></li></ul>"
+            f"<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+            "<pre><code class='language-bash'>echo 'done'\n</code></pre>"
+        )
+    return f"<div class='ghq-card-content__markdown'>{''.join(sections)}</div>"
+
+
+def time_function(function, repeat: int) -> float:
+    """
+    Get the fastest time of several runs of a function, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def get_parsers():
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+
+        parsers.append("lxml")
+    except ImportError:
+        print("lxml is not installed, skipping it")
+    return parsers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    html = generate_card_html(arguments.tables, arguments.rows, arguments.columns)
+    converter = MarkdownConverter()
+    print(f"Card HTML: {len(html):,} bytes, {arguments.tables} tables of {arguments.rows}x{arguments.columns}")
+
+    for html_parser in get_parsers():
+        document = BeautifulSoup(html, html_parser)
+
+        parse_time = time_function(lambda: BeautifulSoup(html, html_parser), arguments.repeat)
+        prettify_time = time_function(document.prettify, arguments.repeat)
+        convert_time = time_function(lambda: converter.convert(document), arguments.repeat)
+
+        prettify_size = len(document.prettify().encode())
+        markdown = converter.convert(document)
+        deterministic = all(converter.convert(BeautifulSoup(html, html_parser)) == markdown for _ in range(3))
+
+        print(f"\n{html_parser}")
+        print(f"  parse:    {parse_time * 1000:8.1f} ms")
+        print(f"  prettify: {prettify_time * 1000:8.1f} ms, {prettify_size:,} bytes")
+        print(f"  markdown: {convert_time * 1000:8.1f} ms, {len(markdown.encode()):,} bytes")
+        print(f"  deterministic output: {deterministic}")
+
+
+if __name__ == "__main__":
+    main()
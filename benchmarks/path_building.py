@@ -0,0 +1,106 @@
+"""
+Benchmark building the paths and URLs of many cards, the hot loop of planning a large sync.
+
+Compares the previous approach, which compiled the slug patterns and read the environment
+for every card, with the module-level patterns, the slug cache, and the per-run GitHubConfig.
+The cached slugs are timed on a first pass, when every title is new, and a second pass,
+when every title has been seen, as when paths are built again during the same run.
+
+Usage: python benchmarks/path_building.py [--cards 10000] [--folders 200] [--repeat 5]
+"""
+
+import argparse
+import re
+import sys
+import time
+from os import environ, path
+from urllib.parse import quote
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+environ.setdefault("GITHUB_REPOSITORY", "octo-org/guru-docs")
+environ.setdefault("GITHUB_REF_NAME", "main")
+environ.setdefault("COLLECTION_DIRECTORY_PATH", "docs")
+
+from github_publisher import GitHubConfig, slugify  # noqa: E402
+
+
+def previous_slugify(string: str) -> str:
+    string = str(string)
+    string = re.sub(r"[^\w\s-]", "", string.lower())
+    return re.sub(r"[-\s]+", "-", string).strip("-_")
+
+
+def build_previous_paths(titles: list, folder_paths: list) -> list:
+    """
+    Build card paths and URLs the way they were built before, reading the environment for each card.
+    """
+    urls = []
+    for card_number, title in enumerate(titles):
+        collection_directory_path = environ["COLLECTION_DIRECTORY_PATH"]
+        card_path = f"{collection_directory_path}/{folder_paths[card_number % len(folder_paths)]}/{previous_slugify(title)}.md"
+        github_server_url = environ.get("GITHUB_SERVER_URL", "https://github.com")
+        repository = environ["GITHUB_REPOSITORY"]
+        github_ref_name = environ["GITHUB_REF_NAME"]
+        urls.append(f"{github_server_url}/{repository}/blob/{github_ref_name}/{quote(card_path)}")
+    return urls
+
+
+def build_paths(config: GitHubConfig, titles: list, folder_paths: list) -> list:
+    """
+    Build card paths and URLs from the per-run configuration and the slug cache.
+    """
+    urls = []
+    for card_number, title in enumerate(titles):
+        card_path = f"{config.collection_directory_path}/{folder_paths[card_number % len(folder_paths)]}/{slugify(title)}.md"
+        urls.append(f"{config.server_url}/{config.repository}/blob/{config.ref_name}/{quote(card_path)}")
+    return urls
+
+
+def time_function(function, repeat: int) -> float:
+    """
+    Get the fastest time of several runs of a function, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=10000)
+    parser.add_argument("--folders", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    titles = [
+        f"Runbook {card_number}: Rotate the credentials of service #{card_number % 97} (v{card_number % 7}.x)"
+        for card_number in range(arguments.cards)
+    ]
+    folder_paths = [f"Collection/Folder {folder_number}/Runbooks" for folder_number in range(arguments.folders)]
+    config = GitHubConfig()
+    print(f"{arguments.cards:,} cards in {arguments.folders} folders")
+
+    previous_time = time_function(lambda: build_previous_paths(titles, folder_paths), arguments.repeat)
+
+    def build_paths_cold():
+        slugify.cache_clear()
+        build_paths(config, titles, folder_paths)
+
+    cold_time = time_function(build_paths_cold, arguments.repeat)
+    warm_time = time_function(lambda: build_paths(config, titles, folder_paths), arguments.repeat)
+
+    identical = build_previous_paths(titles, folder_paths) == build_paths(config, titles, folder_paths)
+
+    print(f"  previous:        {previous_time * 1000:8.1f} ms")
+    print(f"  new, first pass: {cold_time * 1000:8.1f} ms")
+    print(f"  new, cached:     {warm_time * 1000:8.1f} ms")
+    print(f"  slug cache: {slugify.cache_info()}")
+    print(f"  identical paths: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Benchmark a full sync against local fake GitHub and Guru services, without network access.
+
+Synthetic collections are served by the fake Guru service and published to an in-memory
+repository by GitHubPublisher. Several scenarios run one after another on the same repository:
+
+- initial: every card is published to an empty repository
+- unchanged: the same collections are synced again
+- modified: a fraction of the cards change
+- renamed: a fraction of the folders are renamed
+
+API requests, bytes transferred, and wall time are reported for each phase of each scenario.
+Settings like BATCH_COMMITS or WORKER_COUNT can be passed with --env to compare them.
+
+Usage: python benchmarks/sync_benchmark.py [--cards 500] [--depth 2] [--images 1] [--latency 50] [--env BATCH_COMMITS=1]
+"""
+
+import argparse
+import contextlib
+import json
+import shutil
+import subprocess  # nosec B404
+import sys
+import tempfile
+import threading
+import time
+from os import chdir, environ, getcwd, makedirs, path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from fake_services import FakeServiceServer  # noqa: E402
+from synthetic_collections import generate_collection, modify_cards, rename_folders  # noqa: E402
+
+# Methods of GitHubPublisher that start each phase of a sync
+PHASES = {
+    "find_all_collection_cards": "list cards",
+    "get_sync_state": "sync state",
+    "find_incremental_changes": "sync state",
+    "publish_modified_cards": "publish",
+    "prefetch_collections": "prefetch",
+    "publish_collection": "publish",
+    "process_deletions": "deletions",
+    "stage_images": "images",
+    "commit_batched_changes": "commit",
+    "commit_renames": "commit",
+    "save_image_manifest": "metadata",
+    "save_metadata": "metadata",
+}
+
+
+class PhaseTracker:
+    """
+    Track which phase of the sync the main thread is in, and the time spent in each phase.
+    Time spent in a nested phase is only counted for that phase. Requests made by worker
+    threads are counted for the phase the main thread is in at the time.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.stack = []
+        self.phase = "setup"
+        self.phase_started_at = time.perf_counter()
+        self.seconds = {}
+
+    def charge(self):
+        now = time.perf_counter()
+        self.seconds[self.phase] = self.seconds.get(self.phase, 0.0) + now - self.phase_started_at
+        self.phase_started_at = now
+
+    def enter(self, phase: str):
+        self.charge()
+        self.stack.append(self.phase)
+        self.phase = phase
+        self.recorder.set_phase(phase)
+
+    def exit(self):
+        self.charge()
+        self.phase = self.stack.pop()
+        self.recorder.set_phase(self.phase)
+
+    def wrap(self, destination):
+        """
+        Wrap the methods of a publisher that start each phase.
+        """
+        for method_name, phase in PHASES.items():
+            method = getattr(destination, method_name)
+
+            def tracked_method(*args, method=method, phase=phase, **kwargs):
+                if threading.current_thread() is not threading.main_thread():
+                    return method(*args, **kwargs)
+                self.enter(phase)
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.exit()
+
+            setattr(destination, method_name, tracked_method)
+
+
+def set_up_working_directory(collection_directory_path: str) -> str:
+    """
+    Create a Git repository to stand in for the action's checkout, and return the collection directory in it.
+    """
+    repository_path = tempfile.mkdtemp(prefix="guru-to-github-benchmark-")
+    subprocess.run(["/usr/bin/git", "init", "--quiet", repository_path], check=True)  # nosec B603
+
+    if shutil.which("git-lfs") is None:
+        # Without Git LFS, mark images as tracked so `git lfs track` isn't needed
+        with open(path.join(repository_path, ".gitattributes"), "w", encoding="utf-8") as file:
+            file.write("*.png filter=lfs diff=lfs merge=lfs -text\n")
+
+    collection_directory = path.join(repository_path, collection_directory_path)
+    makedirs(collection_directory, exist_ok=True)
+    return collection_directory
+
+
+def run_scenario(github_publisher, server: FakeServiceServer, name: str, collection_ids, verbose: bool) -> dict:
+    """
+    Run one sync and summarize the requests it made.
+    """
+    server.recorder.reset()
+    tracker = PhaseTracker(server.recorder)
+
+    destination = github_publisher.GitHubPublisher(github_publisher.source)
+    tracker.wrap(destination)
+
+    log = sys.stdout if verbose else open(path.join("..", f"{name}.log"), "w", encoding="utf-8")
+    start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            github_publisher.sync_collections(destination, collection_ids)
+    finally:
+        if log is not sys.stdout:
+            log.close()
+    wall_time = time.perf_counter() - start_time
+    tracker.charge()
+
+    requests_by_phase = server.recorder.summarize()
+    phases = {
+        phase: {"seconds": round(tracker.seconds.get(phase, 0.0), 3), **requests_by_phase.get(phase, {})}
+        for phase in dict.fromkeys(list(tracker.seconds) + list(requests_by_phase))
+        if phase != "total"
+    }
+
+    return {
+        "scenario": name,
+        "wall_time": round(wall_time, 3),
+        "total": requests_by_phase.get("total", {"requests": 0, "request_bytes": 0, "response_bytes": 0}),
+        "phases": phases,
+        "repository_files": len(server.github.get_head_tree()),
+        "repository_commits": len(server.github.get_ancestors(server.github.get_head())),
+        "unhandled_routes": server.recorder.list_unhandled(),
+    }
+
+
+def print_report(report: dict):
+    for scenario in report["scenarios"]:
+        total = scenario["total"]
+        print(
+            f"\n{scenario['scenario']}: {scenario['wall_time']:.2f}s, {total['requests']} requests, "
+            f"{total['request_bytes']:,} bytes sent, {total['response_bytes']:,} bytes received, "
+            f"{scenario['repository_commits']} commits in the repository"
+        )
+        for phase, phase_summary in scenario["phases"].items():
+            print(
+                f"  {phase:<12} {phase_summary['seconds']:8.2f}s {phase_summary.get('requests', 0):6} requests "
+                f"{phase_summary.get('request_bytes', 0):>12,} sent {phase_summary.get('response_bytes', 0):>12,} received"
+            )
+            for endpoint, count in phase_summary.get("endpoints", {}).items():
+                print(f"      {count:6} {endpoint}")
+        if scenario["unhandled_routes"]:
+            print(f"  Not implemented by the fake services: {', '.join(scenario['unhandled_routes'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collections", type=int, default=1, help="number of collections")
+    parser.add_argument("--cards", type=int, default=500, help="cards per collection")
+    parser.add_argument("--depth", type=int, default=2, help="depth of the folder tree")
+    parser.add_argument("--folders-per-level", type=int, default=3, help="subfolders in each folder")
+    parser.add_argument("--images", type=int, default=1, help="images per card")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every request")
+    parser.add_argument("--modify-fraction", type=float, default=0.05, help="fraction of cards changed")
+    parser.add_argument("--rename-fraction", type=float, default=0.1, help="fraction of folders renamed")
+    parser.add_argument("--env", action="append", default=[], help="environment variable for the publisher, as NAME=VALUE")
+    parser.add_argument("--output", help="path to write the report to as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the publisher's output")
+    arguments = parser.parse_args()
+
+    server = FakeServiceServer(latency=arguments.latency / 1000).start()
+    collections = [
+        generate_collection(
+            collection_number,
+            arguments.cards,
+            arguments.depth,
+            arguments.images,
+            f"{server.url}/guru/files",
+            folders_per_level=arguments.folders_per_level,
+        )
+        for collection_number in range(arguments.collections)
+    ]
+    for collection in collections:
+        server.guru.add_collection(collection)
+    collection_ids = [collection["collection"]["id"] for collection in collections]
+
+    output_path = path.abspath(arguments.output) if arguments.output else None
+    original_directory = getcwd()
+    working_directory = set_up_working_directory("docs")
+    chdir(working_directory)
+
+    environ.update(
+        {
+            "GITHUB_API_URL": server.url,
+            "GITHUB_SERVER_URL": server.url,
+            "GITHUB_REPOSITORY": server.github.repository,
+            "GITHUB_REF_NAME": server.github.branch,
+            "GITHUB_REF": f"refs/heads/{server.github.branch}",
+            "GITHUB_TOKEN": "benchmark-token",
+            "COLLECTION_DIRECTORY_PATH": "docs",
+            "GURU_COLLECTION_IDS": ",".join(collection_ids),
+            "GURU_USER_EMAIL": "benchmark@example.com",
+            "GURU_USER_TOKEN": "benchmark-token",
+            # Writes to the fake services don't need to be spaced out
+            "GITHUB_WRITE_INTERVAL": "0",
+        }
+    )
+    environ.update(variable.split("=", 1) for variable in arguments.env)
+
+    import guru
+    import github_publisher
+
+    github_publisher.source = guru.Guru(environ["GURU_USER_EMAIL"], environ["GURU_USER_TOKEN"])
+    # The SDK sends every request relative to its base URL
+    github_publisher.source.base_url = server.guru_api_url
+
+    report = {
+        "settings": {key: value for key, value in vars(arguments).items() if key not in ("output", "verbose")},
+        "scenarios": [],
+    }
+    try:
+        report["scenarios"].append(run_scenario(github_publisher, server, "initial", collection_ids, arguments.verbose))
+        report["scenarios"].append(run_scenario(github_publisher, server, "unchanged", collection_ids, arguments.verbose))
+
+        if arguments.modify_fraction:
+            for collection in collections:
+                modify_cards(collection, arguments.modify_fraction)
+            report["scenarios"].append(run_scenario(github_publisher, server, "modified", collection_ids, arguments.verbose))
+
+        if arguments.rename_fraction and arguments.depth:
+            for collection in collections:
+                rename_folders(collection, arguments.rename_fraction)
+            report["scenarios"].append(run_scenario(github_publisher, server, "renamed", collection_ids, arguments.verbose))
+    finally:
+        chdir(original_directory)
+        server.stop()
+
+    print_report(report)
+    print(f"\nPublisher output was written to {working_directory}")
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
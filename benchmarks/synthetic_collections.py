@@ -0,0 +1,166 @@
+"""
+Generate synthetic Guru collections for the fake Guru service.
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+
+# The smallest valid PNG header, padded to the requested image size
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def generate_image(seed: str, size: int) -> bytes:
+    """
+    Generate deterministic image bytes of the given size.
+    """
+    content = bytearray(PNG_SIGNATURE)
+    block = hashlib.sha256(seed.encode()).digest()
+    while len(content) < size:
+        content.extend(block)
+        block = hashlib.sha256(block).digest()
+    return bytes(content[:size])
+
+
+def format_timestamp(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def generate_card_content(card_title: str, paragraphs: int, image_urls: list) -> str:
+    """
+    Generate the HTML of a card with paragraphs, a table, a code block, and images.
+    """
+    sections = [f"<h2>{card_title}</h2>"]
+    for paragraph in range(paragraphs):
+        sections.append(
+            f"<p>Paragraph {paragraph} of {card_title}. Run <code>deploy --step {paragraph}</code> "
+            f"and follow <a href='https://example.com/runbooks/{paragraph}'>the runbook</a>.</p>"
+        )
+    sections.append(
+        "<table><tbody>"
+        + "".join(f"<tr><td>Step {row}</td><td><strong>Check</strong> {row}</td></tr>" for row in range(5))
+        + "</tbody></table>"
+    )
+    sections.append("<pre><code class='language-bash'>echo 'done'</code></pre>")
+    for filename, url in image_urls:
+        sections.append(f'<p><img src="{url}" data-ghq-card-content-image-filename="{filename}"></p>')
+    return f"<div class='ghq-card-content__markdown'>{''.join(sections)}</div>"
+
+
+def generate_collection(
+    collection_number: int,
+    card_count: int,
+    folder_depth: int,
+    images_per_card: int,
+    image_base_url: str,
+    folders_per_level=3,
+    paragraphs_per_card=10,
+    image_size=20000,
+    seed=0,
+) -> dict:
+    """
+    Generate a collection with the given number of cards spread over a tree of folders.
+    Folders are nested up to the given depth, and every folder holds cards.
+    """
+    randomizer = random.Random(f"{seed}-{collection_number}")
+    collection_id = f"collection-{collection_number:04d}"
+    collection = {
+        "id": collection_id,
+        "name": f"Synthetic Collection {collection_number}",
+        "slug": f"{collection_id}-synthetic",
+        "description": f"A synthetic collection with {card_count} cards",
+        "collectionType": "INTERNAL",
+    }
+    collection_summary = {key: collection[key] for key in ("id", "name", "slug")}
+
+    # Build the folder tree one level at a time
+    folders = []
+    parent_folders = [None]
+    for depth in range(folder_depth):
+        level_folders = []
+        for parent_folder in parent_folders:
+            for index in range(folders_per_level):
+                folder_number = len(folders)
+                folder = {
+                    "id": f"{collection_id}-folder-{folder_number:05d}",
+                    "title": f"Folder {folder_number} (level {depth + 1})",
+                    "slug": f"folder-{folder_number}",
+                    "collection": collection_summary,
+                    "folderType": "FOLDER",
+                    "parentFolderId": parent_folder["id"] if parent_folder else None,
+                    "itemIds": [],
+                }
+                if parent_folder:
+                    parent_folder["itemIds"].append(folder["id"])
+                folders.append(folder)
+                level_folders.append(folder)
+        parent_folders = level_folders
+
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    cards = []
+    images = {}
+    for card_number in range(card_count):
+        card_id = f"{collection_id}-card-{card_number:06d}"
+        card_title = f"Runbook {card_number}: {randomizer.choice(['Deploy', 'Rollback', 'Rotate', 'Audit'])} service {card_number % 97}"
+
+        image_urls = []
+        for image_number in range(images_per_card):
+            filename = f"{card_id}-{image_number}.png"
+            images[f"{card_id}/{filename}"] = generate_image(f"{card_id}-{image_number}", image_size)
+            image_urls.append((filename, f"{image_base_url}/{card_id}/{filename}"))
+
+        folder = folders[card_number % len(folders)] if folders else None
+        card = {
+            "id": card_id,
+            "slug": f"{card_id}/Runbook-{card_number}",
+            "preferredPhrase": card_title,
+            "content": generate_card_content(card_title, paragraphs_per_card, image_urls),
+            "collection": collection_summary,
+            "verificationState": "TRUSTED",
+            "cardType": "CARD",
+            "dateCreated": format_timestamp(base_time),
+            "lastModified": format_timestamp(base_time + timedelta(minutes=card_number)),
+            "folders": [{key: folder[key] for key in ("id", "title", "slug")}] if folder else [],
+        }
+        if folder:
+            folder["itemIds"].append(card_id)
+        cards.append(card)
+
+    return {"collection": collection, "folders": folders, "cards": cards, "images": images}
+
+
+def modify_cards(collection: dict, fraction: float, seed=0) -> list:
+    """
+    Change the content and lastModified time of a fraction of a collection's cards.
+    Returns the IDs of the changed cards.
+    """
+    randomizer = random.Random(f"{seed}-modify-{collection['collection']['id']}")
+    cards = collection["cards"]
+    changed_cards = randomizer.sample(cards, round(len(cards) * fraction))
+    modified_time = format_timestamp(datetime.now(timezone.utc))
+
+    for card in changed_cards:
+        card["content"] = card["content"].replace("</div>", "<p>Updated for the benchmark.</p></div>", 1)
+        card["lastModified"] = modified_time
+
+    return [card["id"] for card in changed_cards]
+
+
+def rename_folders(collection: dict, fraction: float, seed=0) -> list:
+    """
+    Rename a fraction of a collection's folders, which moves their files in the repository.
+    Returns the IDs of the renamed folders.
+    """
+    randomizer = random.Random(f"{seed}-rename-{collection['collection']['id']}")
+    folders = collection["folders"]
+    renamed_folders = randomizer.sample(folders, round(len(folders) * fraction))
+
+    for folder in renamed_folders:
+        folder["title"] = f"{folder['title']} (renamed)"
+        folder["slug"] = f"{folder['slug']}-renamed"
+        for card in collection["cards"]:
+            for card_folder in card["folders"]:
+                if card_folder["id"] == folder["id"]:
+                    card_folder.update(title=folder["title"], slug=folder["slug"])
+
+    return [folder["id"] for folder in renamed_folders]
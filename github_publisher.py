@@ -3,19 +3,950 @@ Sync card content from Guru to a GitHub repository.
 """
 
 import base64
+import bisect
+import hashlib
+import json
 import re
+import shutil
+import sqlite3
 import subprocess  # nosec B404
+import tempfile
+import threading
 import time
 import uuid
-from functools import lru_cache
-from os import environ, path
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache, partial, wraps
+from os import environ, fsync, makedirs, path, remove, replace
 from typing import List
 
 import guru
 import requests
 from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter, Retry
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
+
+from markdown_converter import MarkdownConverter
+
+
+# The endpoint of a GitHub API request, after the repository
+ENDPOINT_PATTERN = re.compile(r"^/repos/[^/]+/[^/]+/(git/[a-z]+|[a-z]+)")
+
+# Server errors that are retried, as long as sending the request again is safe
+SERVER_ERROR_STATUS_CODES = [500, 502, 503, 504]
+
+# Characters removed from slugs, and runs of separators replaced with a single dash
+SLUG_REMOVED_CHARACTERS = re.compile(r"[^\w\s-]")
+SLUG_SEPARATORS = re.compile(r"[-\s]+")
+
+
+class GitHubRetry(Retry):
+    """
+    Retry configuration for GitHub API requests.
+    Secondary rate limit responses (403 with a Retry-After header) are retried after
+    the requested delay, and responses that exhausted the rate limit wait until it resets.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset([403, 413, 429, 503])
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+
+        rate_limit_reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and rate_limit_reset:
+            return max(0.0, int(rate_limit_reset) - time.time())
+
+        return None
+
+
+class RateLimitedSession(requests.Session):
+    """
+    A session that schedules GitHub API requests to stay within GitHub's rate limits.
+    The remaining budget is read from the X-RateLimit-* headers of each response.
+    Mutating requests are spaced out, as GitHub recommends, and requests pause until
+    the rate limit resets when the budget runs low instead of failing.
+    Documentation: https://docs.github.com/rest/using-the-rest-api/best-practices-for-using-the-rest-api
+    """
+
+    MUTATING_METHODS = frozenset(["POST", "PATCH", "PUT", "DELETE"])
+
+    def __init__(self, api_url: str, write_interval=1.0, reserve=50, max_rate_limit_waits=3):
+        super().__init__()
+        self.api_url = api_url
+        self.write_interval = write_interval
+        self.reserve = reserve
+        self.max_rate_limit_waits = max_rate_limit_waits
+
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset = None
+        self.next_write = 0.0
+
+        # Budget accounting, reported at the end of the run
+        self.request_count = 0
+        self.write_count = 0
+        self.time_waited = 0.0
+
+        # Records the latency and size of every request when set
+        self.instrumentation = None
+
+    def request(self, method, url, *args, **kwargs):
+        if not str(url).startswith(self.api_url):
+            return self.send_request(method, url, *args, **kwargs)
+
+        for _attempt in range(self.max_rate_limit_waits):
+            self.wait_for_budget(method)
+            response = self.send_request(method, url, *args, **kwargs)
+            self.update_budget(response)
+
+            if not self.is_rate_limited(response):
+                break
+
+            # The retries configured on the adapter did not get past the rate limit
+            delay = self.get_rate_limit_delay(response)
+            print(f"Rate limited by GitHub, waiting {delay:.0f} seconds before trying again")
+            self.pause(delay)
+
+        return response
+
+    def send_request(self, method, url, *args, **kwargs):
+        """
+        Send a request and record its latency and size.
+        Time spent waiting for the rate limit budget is not included.
+        """
+        start_time = time.perf_counter()
+        response = super().request(method, url, *args, **kwargs)
+
+        if self.instrumentation is not None:
+            self.instrumentation.record_request(
+                self.get_endpoint_name(method, url),
+                response,
+                time.perf_counter() - start_time,
+                stream=kwargs.get("stream", False),
+            )
+
+        return response
+
+    def get_endpoint_name(self, method: str, url) -> str:
+        """
+        Name the endpoint of a request without the repository or the path of the file,
+        such as "PUT contents" or "GET git/trees". Other hosts are named by their host.
+        """
+        url = str(url)
+        if url.startswith(self.api_url):
+            match = ENDPOINT_PATTERN.match(url[len(self.api_url) :])
+            if match:
+                return f"{method.upper()} {match.group(1)}"
+        return f"{method.upper()} {urlparse(url).netloc}"
+
+    def pause(self, delay: float):
+        """
+        Sleep for a number of seconds and account for the time spent waiting.
+        """
+        if delay > 0:
+            time.sleep(delay)
+            with self.lock:
+                self.time_waited += delay
+
+    def wait_for_budget(self, method: str):
+        """
+        Wait until a request can be made without exceeding the rate limit.
+        """
+        with self.lock:
+            now = time.time()
+            delay = 0.0
+
+            if self.remaining is not None and self.remaining <= self.reserve and self.reset and self.reset > now:
+                print(f"GitHub rate limit budget is low ({self.remaining} left), pausing until it resets")
+                delay = self.reset - now
+                self.remaining = None
+
+            if method.upper() in self.MUTATING_METHODS:
+                # Reserve the next write slot so concurrent writers are spaced out too
+                delay = max(delay, self.next_write - now)
+                self.next_write = now + delay + self.write_interval
+                self.write_count += 1
+
+            if self.remaining is not None:
+                self.remaining -= 1
+            self.request_count += 1
+
+        self.pause(delay)
+
+    def update_budget(self, response: requests.Response):
+        """
+        Update the remaining budget from a response's rate limit headers.
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        with self.lock:
+            self.remaining = int(remaining)
+            self.reset = int(reset)
+
+    def is_rate_limited(self, response: requests.Response) -> bool:
+        """
+        Check if a response was rejected because of a primary or secondary rate limit.
+        """
+        if response.status_code not in (403, 429):
+            return False
+
+        return (
+            response.headers.get("X-RateLimit-Remaining") == "0"
+            or "Retry-After" in response.headers
+            or "rate limit" in response.text.lower()
+        )
+
+    def get_rate_limit_delay(self, response: requests.Response) -> float:
+        """
+        Get the number of seconds to wait before retrying a rate limited request.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            return float(retry_after)
+
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset:
+            return max(0.0, int(reset) - time.time())
+
+        # GitHub recommends waiting at least a minute when no time is given
+        return 60.0
+
+    def summarize(self) -> str:
+        """
+        Summarize the requests made and the time spent waiting on rate limits.
+        """
+        return (
+            f"GitHub API requests: {self.request_count} ({self.write_count} writes), "
+            f"waited {self.time_waited:.1f} seconds for rate limits, "
+            f"{self.remaining if self.remaining is not None else 'unknown'} requests remaining"
+        )
+
+
+class BlobUploadBody:
+    """
+    The JSON body of a request to create a blob, with the content encoded to base64 one chunk
+    at a time as the request is sent, so the encoded content is never held in memory at once.
+    Documentation: https://docs.github.com/rest/git/blobs#create-a-blob
+    """
+
+    PREFIX = b'{"encoding": "base64", "content": "'
+    SUFFIX = b'"}'
+
+    def __init__(self, content: bytes, chunk_size=3 * 256 * 1024):
+        # Chunks are a multiple of 3 bytes, so only the last one is padded
+        self.content = memoryview(content)
+        self.chunk_size = chunk_size - chunk_size % 3
+
+    def __len__(self):
+        return len(self.PREFIX) + 4 * ((len(self.content) + 2) // 3) + len(self.SUFFIX)
+
+    def __iter__(self):
+        # Each iteration starts from the beginning, so the request can be sent again
+        yield self.PREFIX
+        for start in range(0, len(self.content), self.chunk_size):
+            yield base64.b64encode(self.content[start : start + self.chunk_size])
+        yield self.SUFFIX
+
+
+class Instrumentation:
+    """
+    Counts, latencies, and sizes of the requests and phases of a sync, reported at the end of the run.
+    Latencies are counted in histogram buckets so the report stays the same size for any number of cards.
+    Phases can be nested, so the time of a phase includes the time of the phases inside it.
+    """
+
+    # Upper bounds of the latency histogram buckets, in seconds
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    RATE_LIMIT_HEADERS = {
+        "X-RateLimit-Limit": "limit",
+        "X-RateLimit-Remaining": "remaining",
+        "X-RateLimit-Used": "used",
+        "X-RateLimit-Reset": "reset",
+        "X-RateLimit-Resource": "resource",
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.endpoints = {}
+        self.phases = {}
+        self.rate_limit = {}
+
+    def add(self, statistics: dict, name: str, seconds: float, response_bytes=0, error=False):
+        """
+        Add one measurement to the statistics of an endpoint or phase.
+        """
+        bucket = bisect.bisect_left(self.LATENCY_BUCKETS, seconds)
+        with self.lock:
+            if name not in statistics:
+                statistics[name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "response_bytes": 0,
+                    "histogram": [0] * (len(self.LATENCY_BUCKETS) + 1),
+                }
+            measurements = statistics[name]
+            measurements["count"] += 1
+            measurements["errors"] += int(error)
+            measurements["seconds"] += seconds
+            measurements["max_seconds"] = max(measurements["max_seconds"], seconds)
+            measurements["response_bytes"] += response_bytes
+            measurements["histogram"][bucket] += 1
+
+    @contextmanager
+    def measure(self, phase: str):
+        """
+        Measure the time spent in a phase of the sync.
+        """
+        start_time = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.add(self.phases, phase, time.perf_counter() - start_time, error=error)
+
+    def record_request(self, endpoint: str, response: requests.Response, seconds: float, stream=False):
+        """
+        Record the latency, response size, and rate limit headers of a request.
+        The size of streamed responses is taken from their Content-Length header so they aren't read early.
+        """
+        if stream:
+            response_bytes = int(response.headers.get("Content-Length") or 0)
+        else:
+            response_bytes = len(response.content)
+        self.add(self.endpoints, endpoint, seconds, response_bytes, error=not response.ok)
+
+        rate_limit = {
+            name: response.headers[header]
+            for header, name in self.RATE_LIMIT_HEADERS.items()
+            if header in response.headers
+        }
+        if rate_limit:
+            with self.lock:
+                lowest_remaining = self.rate_limit.get("lowest_remaining")
+                remaining = int(rate_limit.get("remaining", lowest_remaining or 0))
+                self.rate_limit.update(rate_limit)
+                self.rate_limit["lowest_remaining"] = (
+                    remaining if lowest_remaining is None else min(lowest_remaining, remaining)
+                )
+
+    def summarize_statistics(self, statistics: dict) -> dict:
+        """
+        Add averages, an estimated 95th percentile, and labeled histogram buckets to statistics.
+        """
+        labels = [f"<={bucket * 1000:g}ms" for bucket in self.LATENCY_BUCKETS]
+        labels.append(f">{self.LATENCY_BUCKETS[-1] * 1000:g}ms")
+
+        summary = {}
+        for name, measurements in sorted(statistics.items()):
+            count = measurements["count"]
+            # The 95th percentile is the upper bound of the bucket it falls in
+            p95_seconds = None
+            cumulative_count = 0
+            for bucket, bucket_count in zip(self.LATENCY_BUCKETS + (None,), measurements["histogram"]):
+                cumulative_count += bucket_count
+                if cumulative_count >= 0.95 * count:
+                    p95_seconds = bucket if bucket is not None else round(measurements["max_seconds"], 3)
+                    break
+
+            summary[name] = {
+                "count": count,
+                "errors": measurements["errors"],
+                "seconds": round(measurements["seconds"], 3),
+                "mean_seconds": round(measurements["seconds"] / count, 4),
+                "p95_seconds": p95_seconds,
+                "max_seconds": round(measurements["max_seconds"], 3),
+                "response_bytes": measurements["response_bytes"],
+                "histogram": dict(zip(labels, measurements["histogram"])),
+            }
+        return summary
+
+    def build_report(self, caches: dict, session: RateLimitedSession) -> dict:
+        """
+        Build the report of everything measured during the run.
+        """
+        with self.lock:
+            phases = dict(self.phases)
+            endpoints = dict(self.endpoints)
+            rate_limit = dict(self.rate_limit)
+
+        return {
+            "seconds": round(time.perf_counter() - self.started_at, 3),
+            "phases": self.summarize_statistics(phases),
+            "endpoints": self.summarize_statistics(endpoints),
+            "rate_limit": rate_limit,
+            "rate_limit_budget": {
+                "requests": session.request_count,
+                "writes": session.write_count,
+                "seconds_waited": round(session.time_waited, 3),
+            },
+            "caches": {
+                name: {
+                    "hits": cache_info.hits,
+                    "misses": cache_info.misses,
+                    "hit_rate": round(cache_info.hits / (cache_info.hits + cache_info.misses), 3)
+                    if cache_info.hits + cache_info.misses
+                    else None,
+                    "size": cache_info.currsize,
+                }
+                for name, cache_info in caches.items()
+            },
+        }
+
+    def format_job_summary(self, report: dict) -> str:
+        """
+        Format a report as Markdown for the GitHub Actions job summary.
+        """
+        lines = [f"## Guru to GitHub sync ({report['seconds']:.1f}s)", ""]
+
+        for title, statistics in (("Phase", report["phases"]), ("Endpoint", report["endpoints"])):
+            if not statistics:
+                continue
+            lines.append(f"| {title} | Count | Errors | Total | Mean | p95 | Max | Received |")
+            lines.append("| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |")
+            for name, summary in statistics.items():
+                p95 = f"≤{summary['p95_seconds']:g}s" if summary["p95_seconds"] is not None else ""
+                lines.append(
+                    f"| `{name}` | {summary['count']} | {summary['errors']} | {summary['seconds']:.2f}s "
+                    f"| {summary['mean_seconds'] * 1000:.0f}ms | {p95} | {summary['max_seconds']:.2f}s "
+                    f"| {summary['response_bytes']:,} B |"
+                )
+            lines.append("")
+
+        lines.append("| Cache | Hits | Misses | Hit rate |")
+        lines.append("| --- | ---: | ---: | ---: |")
+        for name, cache in report["caches"].items():
+            hit_rate = f"{cache['hit_rate']:.0%}" if cache["hit_rate"] is not None else ""
+            lines.append(f"| `{name}` | {cache['hits']} | {cache['misses']} | {hit_rate} |")
+        lines.append("")
+
+        budget = report["rate_limit_budget"]
+        rate_limit = report["rate_limit"]
+        lines.append(
+            f"GitHub API requests: {budget['requests']} ({budget['writes']} writes), "
+            f"waited {budget['seconds_waited']:.1f}s for rate limits. "
+            f"Rate limit: {rate_limit.get('remaining', 'unknown')} of {rate_limit.get('limit', 'unknown')} remaining, "
+            f"lowest {rate_limit.get('lowest_remaining', 'unknown')}."
+        )
+        return "\n".join(lines) + "\n"
+
+
+def measured(phase: str):
+    """
+    Measure the time spent in a method of the publisher as a phase of the sync.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def measured_method(self, *args, **kwargs):
+            with self.instrumentation.measure(phase):
+                return method(self, *args, **kwargs)
+
+        return measured_method
+
+    return decorator
+
+
+class RepositoryIndex:
+    """
+    An in-memory index of the files and directories in a GitHub repository tree.
+    Paths map to their Git object SHA and mode, and blob SHAs map back to their paths.
+    """
+
+    def __init__(self, commit_sha: str, tree: dict):
+        self.tree_sha = tree.get("sha")
+        # Recursive trees are truncated by GitHub when they are too large
+        self.truncated = bool(tree.get("truncated"))
+        self.entries = {}
+        self.paths_by_sha = {}
+        # Number of files under each directory, used to tell when a directory stops existing
+        self.directory_file_counts = {}
+
+        for item in tree.get("tree", []):
+            if item["type"] == "blob":
+                self.add(item["path"], item["sha"], item["mode"])
+
+        # Directories keep the SHA of their tree until a file in them changes
+        for item in tree.get("tree", []):
+            if item["type"] == "tree" and item["path"] in self.entries:
+                self.entries[item["path"]]["sha"] = item["sha"]
+
+        # Files in the tree of the head commit, which changes staged for a batch are based on
+        self.base_paths = {file_path for file_path, entry in self.entries.items() if entry["type"] == "blob"}
+        self.set_head(commit_sha, self.tree_sha)
+
+    def set_head(self, commit_sha: str, tree_sha: str, written_paths=()):
+        """
+        Record the commit and tree that the indexed files were last committed in.
+        Only the paths written by that commit change in the head commit's tree, since
+        the index can also hold changes that are staged but not committed yet.
+        """
+        self.commit_sha = commit_sha
+        self.tree_sha = tree_sha
+        self.update_base_paths(written_paths)
+
+    def update_base_paths(self, written_paths):
+        """
+        Record that written paths now exist, or no longer exist, in the base of the next batch.
+        """
+        for file_path in written_paths:
+            if self.is_file(file_path):
+                self.base_paths.add(file_path)
+            else:
+                self.base_paths.discard(file_path)
+
+    def get_parent_directories(self, file_path: str):
+        """
+        Get every directory that contains the given path.
+        """
+        parts = file_path.split("/")[:-1]
+        return ["/".join(parts[: index + 1]) for index in range(len(parts))]
+
+    def get(self, file_path: str):
+        """
+        Get the index entry for a file or directory, or None if it does not exist.
+        """
+        return self.entries.get(file_path)
+
+    def exists(self, file_path: str) -> bool:
+        """
+        Check if a file or directory exists.
+        """
+        return file_path in self.entries
+
+    def is_file(self, file_path: str) -> bool:
+        """
+        Check if a path is a file.
+        """
+        entry = self.entries.get(file_path)
+        return entry is not None and entry["type"] == "blob"
+
+    def find_paths_by_sha(self, sha: str) -> List[str]:
+        """
+        Get the paths of every file with the given blob SHA.
+        """
+        return sorted(self.paths_by_sha.get(sha, ()))
+
+    def list_files(self, file_path: str) -> List[str]:
+        """
+        List the given file, or every file in the given directory.
+        """
+        if self.is_file(file_path):
+            return [file_path]
+        if file_path not in self.directory_file_counts:
+            return []
+
+        directory_prefix = f"{file_path}/"
+        return [
+            indexed_path
+            for indexed_path, entry in self.entries.items()
+            if entry["type"] == "blob" and indexed_path.startswith(directory_prefix)
+        ]
+
+    def add(self, file_path: str, sha: str, mode="100644"):
+        """
+        Add or update a file in the index.
+        """
+        if self.is_file(file_path):
+            self.remove(file_path)
+
+        self.entries[file_path] = {"sha": sha, "mode": mode, "type": "blob"}
+        self.paths_by_sha.setdefault(sha, set()).add(file_path)
+
+        for directory in self.get_parent_directories(file_path):
+            self.directory_file_counts[directory] = self.directory_file_counts.get(directory, 0) + 1
+            # The directory's tree SHA is no longer known once its contents change
+            self.entries[directory] = {"sha": None, "mode": "040000", "type": "tree"}
+
+    def remove(self, file_path: str):
+        """
+        Remove a file from the index. Directories left empty are removed too.
+        """
+        entry = self.entries.get(file_path)
+        if entry is None or entry["type"] != "blob":
+            return None
+
+        del self.entries[file_path]
+        paths = self.paths_by_sha.get(entry["sha"], set())
+        paths.discard(file_path)
+        if not paths:
+            self.paths_by_sha.pop(entry["sha"], None)
+
+        for directory in self.get_parent_directories(file_path):
+            self.directory_file_counts[directory] -= 1
+            if self.directory_file_counts[directory]:
+                self.entries[directory]["sha"] = None
+            else:
+                del self.directory_file_counts[directory]
+                del self.entries[directory]
+
+        return entry
+
+    def move(self, old_path: str, new_path: str) -> dict:
+        """
+        Move a file or directory. Returns the moved entries keyed by their old path.
+        """
+        moved_entries = {}
+        for file_path in self.list_files(old_path):
+            moved_entries[file_path] = self.remove(file_path)
+
+        for file_path, entry in moved_entries.items():
+            self.add(f"{new_path}{file_path[len(old_path):]}", entry["sha"], entry["mode"])
+
+        return moved_entries
+
+
+class MetadataPathIndex:
+    """
+    A sorted index of the external paths in the metadata, so every entry
+    under a renamed directory can be found without scanning all of the metadata.
+    """
+
+    def __init__(self, metadata: dict):
+        self.entries = sorted(
+            (guru_metadata["external_path"], guru_id)
+            for guru_id, guru_metadata in metadata.items()
+            if guru_metadata.get("external_path")
+        )
+
+    def add(self, external_path: str, guru_id: str):
+        """
+        Add an entry to the index.
+        """
+        bisect.insort(self.entries, (external_path, guru_id))
+
+    def remove(self, external_path: str, guru_id: str):
+        """
+        Remove an entry from the index if it's there.
+        """
+        index = bisect.bisect_left(self.entries, (external_path, guru_id))
+        if index < len(self.entries) and self.entries[index] == (external_path, guru_id):
+            del self.entries[index]
+
+    def find_under(self, directory_path: str) -> List[tuple]:
+        """
+        Find every (external path, Guru ID) entry inside a directory.
+        """
+        directory_prefix = f"{directory_path}/"
+        start = bisect.bisect_left(self.entries, (directory_prefix,))
+        end = start
+        while end < len(self.entries) and self.entries[end][0].startswith(directory_prefix):
+            end += 1
+        return self.entries[start:end]
+
+
+class MetadataStore(ABC):
+    """
+    Base class for the ways the GitHubPublisher metadata can be stored.
+    Each record is remembered as it was last loaded or saved, so saving
+    only has to write the records that changed.
+    """
+
+    file_path = ""
+
+    def __init__(self):
+        self.saved_records = {}
+
+    def exists(self) -> bool:
+        """
+        Check if the metadata has been stored in this format.
+        """
+        return path.exists(self.file_path)
+
+    def serialize(self, guru_id: str, record: dict) -> str:
+        """
+        Serialize a record deterministically so unchanged records serialize the same way.
+        """
+        return json.dumps({"id": guru_id, "metadata": record}, sort_keys=True, ensure_ascii=False)
+
+    def remember(self, metadata: dict):
+        """
+        Remember the records as they are stored.
+        """
+        self.saved_records = {
+            guru_id: self.serialize(guru_id, record) for guru_id, record in metadata.items()
+        }
+
+    def get_changes(self, metadata: dict):
+        """
+        Get the serialized records that were added or changed, and the IDs of removed records.
+        """
+        changed_records = {}
+        for guru_id, record in metadata.items():
+            serialized_record = self.serialize(guru_id, record)
+            if self.saved_records.get(guru_id) != serialized_record:
+                changed_records[guru_id] = serialized_record
+
+        removed_ids = [guru_id for guru_id in self.saved_records if guru_id not in metadata]
+        return changed_records, removed_ids
+
+    def write_atomically(self, content: str):
+        """
+        Write the file in one step so an interrupted run can't leave it half written.
+        """
+        temporary_path = f"{self.file_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        replace(temporary_path, self.file_path)
+
+    @abstractmethod
+    def load(self) -> dict:
+        """
+        Load the stored metadata and remember its records.
+        """
+
+    @abstractmethod
+    def save(self, metadata: dict):
+        """
+        Store the metadata, writing only what changed since it was loaded or last saved.
+        """
+
+
+class JsonMetadataStore(MetadataStore):
+    """
+    Stores the metadata as one JSON document, the format used by the Guru SDK.
+    """
+
+    file_path = "GitHubPublisher.json"
+
+    def load(self) -> dict:
+        with open(self.file_path, encoding="utf-8") as file:
+            metadata = json.load(file)
+        self.remember(metadata)
+        return metadata
+
+    def save(self, metadata: dict):
+        changed_records, removed_ids = self.get_changes(metadata)
+        if not changed_records and not removed_ids and self.exists():
+            return
+
+        self.write_atomically(json.dumps(metadata, indent=2))
+        self.remember(metadata)
+
+
+class JsonLinesMetadataStore(MetadataStore):
+    """
+    Stores the metadata as one compact JSON record per line, sorted by Guru ID,
+    so a change to one record only changes one line of the file.
+    """
+
+    file_path = "GitHubPublisher.jsonl"
+
+    def load(self) -> dict:
+        metadata = {}
+        with open(self.file_path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    metadata[record["id"]] = record["metadata"]
+        self.remember(metadata)
+        return metadata
+
+    def save(self, metadata: dict):
+        changed_records, removed_ids = self.get_changes(metadata)
+        if not changed_records and not removed_ids and self.exists():
+            return
+
+        # Unchanged records are written exactly as they were read
+        records = {
+            guru_id: changed_records.get(guru_id) or self.saved_records[guru_id]
+            for guru_id in metadata
+        }
+        self.write_atomically("".join(f"{records[guru_id]}\n" for guru_id in sorted(records)))
+        self.saved_records = records
+
+
+class SqliteMetadataStore(MetadataStore):
+    """
+    Stores the metadata in an SQLite database with one row per record.
+    Only added, changed, and removed rows are written, in a single transaction.
+    """
+
+    file_path = "GitHubPublisher.db"
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.file_path)
+        connection.execute("CREATE TABLE IF NOT EXISTS metadata (id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        return connection
+
+    def load(self) -> dict:
+        connection = self.connect()
+        try:
+            rows = connection.execute("SELECT id, record FROM metadata").fetchall()
+        finally:
+            connection.close()
+
+        metadata = {guru_id: json.loads(record)["metadata"] for guru_id, record in rows}
+        self.saved_records = dict(rows)
+        return metadata
+
+    def save(self, metadata: dict):
+        changed_records, removed_ids = self.get_changes(metadata)
+        if not changed_records and not removed_ids and self.exists():
+            return
+
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO metadata (id, record) VALUES (?, ?)",
+                    changed_records.items(),
+                )
+                connection.executemany(
+                    "DELETE FROM metadata WHERE id = ?",
+                    [(guru_id,) for guru_id in removed_ids],
+                )
+        finally:
+            connection.close()
+
+        self.saved_records.update(changed_records)
+        for guru_id in removed_ids:
+            del self.saved_records[guru_id]
+
+
+METADATA_STORES = {
+    "json": JsonMetadataStore,
+    "jsonl": JsonLinesMetadataStore,
+    "sqlite": SqliteMetadataStore,
+}
+
+
+class SyncJournal:
+    """
+    A write-ahead journal of the metadata records changed by completed GitHub writes.
+    Records are appended and flushed to disk after every write, which costs the same
+    for any size of metadata, and the journal is cleared once the metadata is saved.
+    If a run is interrupted, the next run replays the journal so the objects that were
+    already published are recognized without looking for them in the repository.
+    """
+
+    file_path = "GitHubPublisher.journal"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed_ids = set()
+
+    def mark_changed(self, *guru_ids: str):
+        """
+        Mark metadata records as changed, to be written with the next flush.
+        """
+        with self.lock:
+            self.changed_ids.update(guru_ids)
+
+    def flush(self, metadata: dict):
+        """
+        Append the records that changed since the last flush and make sure they reach the disk.
+        Records that were removed are written as deletions.
+        """
+        with self.lock:
+            changed_ids = sorted(self.changed_ids)
+            self.changed_ids = set()
+
+        if not changed_ids:
+            return
+
+        lines = [
+            json.dumps(
+                {"id": guru_id, "metadata": metadata[guru_id]}
+                if guru_id in metadata
+                else {"id": guru_id, "deleted": True},
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+            for guru_id in changed_ids
+        ]
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write("".join(f"{line}\n" for line in lines))
+            file.flush()
+            fsync(file.fileno())
+
+    def replay(self, metadata: dict) -> int:
+        """
+        Apply the records of an interrupted run to the metadata, in the order they were written.
+        A partly written last line is ignored. Returns the number of records applied.
+        """
+        if not path.exists(self.file_path):
+            return 0
+
+        replayed_count = 0
+        with open(self.file_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+
+                if record.get("deleted"):
+                    metadata.pop(record["id"], None)
+                else:
+                    metadata[record["id"]] = record["metadata"]
+                replayed_count += 1
+
+        return replayed_count
+
+    def clear(self):
+        """
+        Empty the journal once everything in it has been saved with the metadata.
+        The file is kept, so removing it doesn't have to be committed.
+        """
+        with self.lock:
+            self.changed_ids = set()
+        if path.exists(self.file_path) and path.getsize(self.file_path):
+            open(self.file_path, "w").close()
+
+
+@lru_cache(maxsize=16384)
+def slugify(string: str) -> str:
+    """
+    Turns a string into a slug.
+    - Convert spaces or repeated dashes to single dashes
+    - Remove characters that aren't alphanumerics, underscores, or hyphens
+    - Convert to lowercase
+    - Strip leading and trailing whitespace, dashes, and underscores
+    """
+    string = SLUG_REMOVED_CHARACTERS.sub("", string.lower())
+    return SLUG_SEPARATORS.sub("-", string).strip("-_")
+
+
+class GitHubConfig:
+    """
+    Settings of the GitHub repository being published to, read from the environment once per run.
+    """
+
+    def __init__(self):
+        self.api_url = environ.get("GITHUB_API_URL", "https://api.github.com")
+        self.server_url = environ.get("GITHUB_SERVER_URL", "https://github.com")
+        self.repository = environ["GITHUB_REPOSITORY"]
+        self.ref_name = environ["GITHUB_REF_NAME"]
+        self.ref = environ.get("GITHUB_REF") or f"refs/heads/{self.ref_name}"
+        self.collection_directory_path = environ["COLLECTION_DIRECTORY_PATH"]
+
+        # Prefix of every REST API URL for the repository
+        self.repository_url = f"{self.api_url}/repos/{self.repository}"
+        self.headers = {}
+
+    def get_headers(self, media_type: str) -> dict:
+        """
+        Get the headers for a GitHub API request, built once for each media type.
+        """
+        if media_type not in self.headers:
+            self.headers[media_type] = {
+                "Accept": media_type,
+                "Authorization": f"Bearer {environ['GITHUB_TOKEN']}",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+        return self.headers[media_type]
 
 
 class GitHubPublisher(guru.PublisherFolders):
@@ -25,21 +956,162 @@ class GitHubPublisher(guru.PublisherFolders):
 
     def __init__(self, source):
         super().__init__(source)
+        self.config = GitHubConfig()
         if environ.get("PUBLISH_UNVERIFIED_CARDS"):
             self.skip_unverified_cards = False
         if environ.get("DRY_RUN"):
             self.dry_run = True
 
+        # In plan mode, the changes a sync would make are computed without writing anything
+        self.plan_only = bool(environ.get("PLAN_ONLY"))
+
+        # Metadata can be kept in another format than the SDK's JSON document.
+        # It's migrated from whichever format it was last stored in.
+        metadata_backend = environ.get("METADATA_BACKEND") or "json"
+        if metadata_backend not in METADATA_STORES:
+            raise ValueError(f"Unknown METADATA_BACKEND '{metadata_backend}', expected one of {list(METADATA_STORES)}")
+        self.metadata_store = METADATA_STORES[metadata_backend]()
+        # The store the metadata was migrated from, if it wasn't in the configured store yet
+        self.migrated_metadata_store = None
+        self.load_metadata()
+
+        # Metadata changed by completed writes is journaled, so an interrupted run can be resumed
+        self.journal = SyncJournal()
+        replayed_count = self.journal.replay(self._PublisherFolders__metadata)
+        if replayed_count:
+            print(f"Resuming an interrupted sync with {replayed_count} metadata changes from {self.journal.file_path}")
+
+        # In batch mode, file changes are collected during the run and
+        # committed together with a single tree, commit, and reference update
+        self.batch_commits = bool(environ.get("BATCH_COMMITS"))
+
+        # Files larger than this many bytes are uploaded as blobs and committed with a tree,
+        # because the Contents API needs the whole file base64-encoded in one JSON body
+        self.large_file_threshold = int(environ.get("LARGE_FILE_THRESHOLD") or 1024 * 1024)
+
+        # The git backend writes files to the local checkout instead of using the REST API,
+        # and commits them with the images and metadata in one commit that's pushed once
+        self.publish_backend = environ.get("PUBLISH_BACKEND") or "rest"
+        if self.publish_backend not in ("rest", "git"):
+            raise ValueError(f"Unknown PUBLISH_BACKEND '{self.publish_backend}', expected 'rest' or 'git'")
+        if self.publish_backend == "git":
+            # Changes are collected the same way as in batch mode and written to the working tree at the end
+            self.batch_commits = True
+        self.batched_changes = {}
+        self.batched_commit_messages = []
+
+        # Sorted index of external paths in the metadata, built the first time a directory is renamed
+        self.metadata_path_index = None
+
+        # Reverse index of external IDs to Guru IDs, built the first time it is needed
+        self.guru_ids_by_external_id = None
+        self.indexed_metadata_size = 0
+
+        # Guru folder hierarchy, mapping folder IDs to their title and parent folder ID.
+        # Folders are added the first time they're needed, and their paths are cached by ID.
+        self.folder_hierarchy = {}
+        self.unresolved_folders = {}
+        self.home_folder_ids = {}
+        self.external_folder_paths = {}
+
+        # Index of the repository tree, loaded the first time it is needed
+        self.repository_index = None
+
+        # Card content is published as HTML, as before, unless Markdown is requested
+        self.content_format = environ.get("CONTENT_FORMAT") or "html"
+        if self.content_format not in ("markdown", "html"):
+            raise ValueError(f"Unknown CONTENT_FORMAT '{self.content_format}', expected 'markdown' or 'html'")
+        self.markdown_converter = MarkdownConverter()
+
+        # With more than one worker, cards are rendered and their images are
+        # downloaded on worker threads ahead of the SDK publishing them in order
+        self.worker_count = int(environ.get("WORKER_COUNT") or 1)
+        self.card_executor = None
+        self.image_staging_directory = None
+        self.rendered_cards = {}
+        # Collections in the order they are published, so only the next one is rendered ahead
+        self.collection_order = []
+        if self.worker_count > 1:
+            self.card_executor = ThreadPoolExecutor(max_workers=self.worker_count)
+            self.image_staging_directory = tempfile.mkdtemp(prefix="guru-images-")
+
+        # With a read concurrency above one, the repository tree, cards, folders, existence
+        # checks, and image downloads are read concurrently on a thread pool of that size
+        self.read_concurrency = int(environ.get("READ_CONCURRENCY") or 1)
+        self.read_executor = None
+        if self.read_concurrency > 1:
+            self.read_executor = ThreadPoolExecutor(max_workers=self.read_concurrency, thread_name_prefix="reads")
+        # Existence checks made ahead of time for paths missing from a truncated repository tree
+        self.checked_contents = {}
+
+        # One connection-pooled session is shared by every request so connections
+        # are reused, and failed requests are retried with exponential backoff
+        self.max_retries = int(environ.get("HTTP_MAX_RETRIES") or 5)
+        self.session = self.create_session(
+            pool_size=int(
+                environ.get("HTTP_POOL_SIZE") or max(10, self.worker_count, self.read_concurrency)
+            ),
+            max_retries=self.max_retries,
+        )
+
+        # Counts and latencies of every request and phase, reported at the end of the run
+        self.instrumentation = Instrumentation()
+        self.session.instrumentation = self.instrumentation
+
+        # In incremental mode, runs are skipped when nothing changed in Guru since the
+        # last sync, except for a full sync at least once per interval
+        self.incremental_sync = bool(environ.get("INCREMENTAL_SYNC"))
+        self.full_sync_interval = float(environ.get("FULL_SYNC_INTERVAL_HOURS") or 24) * 3600
+        self.collection_cards = {}
+
+        # Time spent fetching, rendering, and publishing each collection
+        self.collection_timings = {}
+        self.timings_lock = threading.Lock()
+
+        # Images added during the run, staged for commit together at the end
+        self.unstaged_image_paths = set()
+
+        # Size and content hash of every downloaded image, keyed by its path,
+        # so images that are already in the repository aren't downloaded again
+        self.image_manifest_path = "GitHubPublisherImages.json"
+        self.image_manifest = {}
+        if path.exists(self.image_manifest_path):
+            with open(self.image_manifest_path, encoding="utf-8") as file:
+                self.image_manifest = json.load(file)
+
+    def create_session(self, pool_size: int, max_retries: int) -> RateLimitedSession:
+        """
+        Create a connection-pooled session that retries server errors and rate limited requests,
+        and schedules GitHub API requests to stay within the rate limit.
+        """
+        retries = GitHubRetry(
+            total=max_retries,
+            backoff_factor=1,
+            status_forcelist=[429] + SERVER_ERROR_STATUS_CODES,
+            # Reads and Git data writes (blobs, trees, commits, and reference updates to a given SHA)
+            # are safe to send again. Contents API writes aren't, so send_contents_write retries them.
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS", "POST", "PATCH"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+        )
+
+        session = RateLimitedSession(
+            self.config.api_url,
+            write_interval=float(environ.get("GITHUB_WRITE_INTERVAL") or 1.0),
+            reserve=int(environ.get("GITHUB_RATE_LIMIT_RESERVE") or 50),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     def get_headers(self, media_type="application/vnd.github+json"):
         """
         Get the headers for a GitHub API request.
+        The headers are shared between requests and must not be changed.
         """
-        headers = {
-            "Accept": media_type,
-            "Authorization": f"Bearer {environ['GITHUB_TOKEN']}",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-        return headers
+        return self.config.get_headers(media_type)
 
     def generate_external_id(self, guru_id: str, response_json):
         """
@@ -47,7 +1119,15 @@ class GitHubPublisher(guru.PublisherFolders):
         """
         external_id = str(uuid.uuid4())
         self._PublisherFolders__update_metadata(guru_id)
+
+        # Replace the object's previous external ID in the reverse index
+        previous_external_id = self._PublisherFolders__metadata[guru_id].get("external_id")
+        if self.guru_ids_by_external_id is not None:
+            self.guru_ids_by_external_id.pop(previous_external_id, None)
+            self.guru_ids_by_external_id[external_id] = guru_id
+
         self._PublisherFolders__metadata[guru_id]["external_id"] = external_id
+        self.journal.mark_changed(guru_id)
         self.update_external_metadata(guru_id, response_json)
         return external_id
 
@@ -57,13 +1137,38 @@ class GitHubPublisher(guru.PublisherFolders):
         """
         return self._PublisherFolders__metadata.get(guru_id, {})
 
+    def index_guru_ids(self):
+        """
+        Build the reverse index of external IDs to Guru IDs from the metadata.
+        """
+        metadata = self._PublisherFolders__metadata
+        self.guru_ids_by_external_id = {
+            guru_metadata["external_id"]: guru_id
+            for guru_id, guru_metadata in metadata.items()
+            if guru_metadata.get("external_id")
+        }
+        self.indexed_metadata_size = len(metadata)
+
     def get_guru_id(self, external_id: str):
         """
         Get the Guru ID for a given external ID.
         """
-        for guru_id, metadata in self._PublisherFolders__metadata.items():
-            if metadata.get("external_id") == external_id:
-                return guru_id
+        metadata = self._PublisherFolders__metadata
+        if self.guru_ids_by_external_id is None:
+            self.index_guru_ids()
+
+        guru_id = self.guru_ids_by_external_id.get(external_id)
+        if guru_id is None and len(metadata) != self.indexed_metadata_size:
+            # Metadata was added outside of generate_external_id, so index it again
+            self.index_guru_ids()
+            guru_id = self.guru_ids_by_external_id.get(external_id)
+
+        # The SDK removes metadata entries directly, so drop entries that are gone
+        if guru_id is not None and metadata.get(guru_id, {}).get("external_id") != external_id:
+            del self.guru_ids_by_external_id[external_id]
+            return None
+
+        return guru_id
 
     def update_external_metadata(self, guru_id: str, response_json):
         """
@@ -73,21 +1178,153 @@ class GitHubPublisher(guru.PublisherFolders):
             response_json = response_json.get("content")
 
         metadata = self._PublisherFolders__metadata[guru_id]
-        metadata["external_name"] = response_json["name"]
-        metadata["external_path"] = response_json["path"]
-        metadata["external_sha"] = response_json["sha"]
-        metadata["external_url"] = response_json["html_url"]
+        if self.metadata_path_index is not None and metadata.get("external_path") != response_json["path"]:
+            if metadata.get("external_path"):
+                self.metadata_path_index.remove(metadata["external_path"], guru_id)
+            self.metadata_path_index.add(response_json["path"], guru_id)
+
+        external_metadata = {
+            "external_name": response_json["name"],
+            "external_path": response_json["path"],
+            "external_sha": response_json["sha"],
+            "external_url": response_json["html_url"],
+        }
+        if any(metadata.get(key) != value for key, value in external_metadata.items()):
+            metadata.update(external_metadata)
+            self.journal.mark_changed(guru_id)
+
+    def move_external_paths(self, old_directory_path: str, new_directory_path: str):
+        """
+        Update the metadata of everything inside a renamed directory to point to the new directory.
+        """
+        if self.metadata_path_index is None:
+            self.metadata_path_index = MetadataPathIndex(self._PublisherFolders__metadata)
+
+        for old_path, guru_id in self.metadata_path_index.find_under(old_directory_path):
+            self.metadata_path_index.remove(old_path, guru_id)
+
+            metadata = self.get_metadata(guru_id)
+            if metadata.get("external_path") != old_path:
+                # The entry was removed or changed since it was indexed
+                continue
+
+            new_path = f"{new_directory_path}{old_path[len(old_directory_path):]}"
+            object_type = "tree" if self.get_type(guru_id) == "folder" else "blob"
+            metadata["external_path"] = new_path
+            metadata["external_url"] = self.get_html_url(new_path, object_type)
+            self.metadata_path_index.add(new_path, guru_id)
+            self.journal.mark_changed(guru_id)
+
+    def get_html_url(self, file_path: str, object_type="blob"):
+        """
+        Build the URL to a file ("blob") or directory ("tree") on GitHub.
+        """
+        config = self.config
+        return f"{config.server_url}/{config.repository}/{object_type}/{config.ref_name}/{quote(file_path)}"
+
+    def get_git_blob_sha(self, content: str) -> str:
+        """
+        Compute the SHA Git assigns to a blob with the given content.
+        """
+        data = content.encode()
+        return hashlib.sha1(f"blob {len(data)}\0".encode() + data, usedforsecurity=False).hexdigest()
+
+    def build_response(self, status_code: int, response_json) -> requests.Response:
+        """
+        Build a response object for a change that has not been sent to GitHub yet.
+        This lets batched changes be handled the same way as GitHub API responses.
+        """
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = json.dumps(response_json).encode()
+        return response
+
+    def get_repository_index(self) -> RepositoryIndex:
+        """
+        Get the index of the branch's repository tree.
+        The tree is requested once and kept up to date as files are written.
+        """
+        if self.repository_index is None and self.publish_backend == "git":
+            self.repository_index = RepositoryIndex(*self.get_local_tree())
+        elif self.repository_index is None:
+            latest_commit_sha = self.get_a_branch(self.config.ref_name).get("commit").get("sha")
+            tree = self.get_a_tree(latest_commit_sha, recursive=True)
+            # Every existence check relies on the index, so an incomplete response can't be used
+            if not isinstance(tree.get("tree"), list) or not tree.get("sha"):
+                raise ValueError(f"GitHub returned an invalid tree for commit {latest_commit_sha}")
+            self.repository_index = RepositoryIndex(latest_commit_sha, tree)
+
+            if self.repository_index.truncated:
+                print("Repository tree is too large to index completely; missing paths will be requested individually")
+
+        return self.repository_index
+
+    def get_indexed_content(self, file_path: str) -> requests.Response:
+        """
+        Get the metadata of a file or directory from the repository index.
+        The response has the same shape as get_repository_content, without the file content.
+        """
+        repository_index = self.get_repository_index()
+        entry = repository_index.get(file_path)
+
+        if entry is None:
+            if repository_index.truncated:
+                checked_content = self.checked_contents.pop(file_path, None)
+                if checked_content is not None:
+                    return checked_content
+                return self.get_repository_content(file_path, repository_index.commit_sha)
+            return self.build_response(404, {"message": "Not Found"})
+
+        is_file = entry["type"] == "blob"
+        return self.build_response(
+            200,
+            {
+                "type": "file" if is_file else "dir",
+                "name": path.basename(file_path),
+                "path": file_path,
+                "sha": entry["sha"],
+                "html_url": self.get_html_url(file_path, "blob" if is_file else "tree"),
+            },
+        )
+
+    def get_published_file(self, guru_id: str, file_path: str) -> requests.Response:
+        """
+        Get the metadata of a published file, including its blob SHA, without downloading it.
+        If the file is missing from a truncated repository index, the metadata stored
+        for the Guru object is used when it points to the same path.
+        """
+        repository_index = self.get_repository_index()
+        metadata = self.get_metadata(guru_id)
+
+        if (
+            repository_index.truncated
+            and not repository_index.exists(file_path)
+            and metadata.get("external_path") == file_path
+            and metadata.get("external_sha")
+        ):
+            return self.build_response(
+                200,
+                {
+                    "type": "file",
+                    "name": metadata["external_name"],
+                    "path": file_path,
+                    "sha": metadata["external_sha"],
+                    "html_url": metadata["external_url"],
+                },
+            )
+
+        return self.get_indexed_content(file_path)
 
     @lru_cache
-    def get_repository_content(self, file_path=""):
+    def get_repository_content(self, file_path="", ref=None):
         """
         Get the contents of a file or directory in a GitHub repository.
+        Pass the SHA of a commit that was just created as the ref to read your own writes.
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/contents/{quote(file_path)}"
+        query_parameters = f"?ref={ref}" if ref else ""
+        url = f"{self.config.repository_url}/contents/{quote(file_path)}{query_parameters}"
 
-        response = requests.get(
+        response = self.session.get(
             url,
             # Use the `object` media type parameter to retrieve the contents
             # in a consistent object format regardless of the content type
@@ -98,33 +1335,80 @@ class GitHubPublisher(guru.PublisherFolders):
 
         return response
 
+    @measured("delete_a_file")
     def delete_a_file(self, file_path: str, commit_message: str, sha: str):
         """
         Delete a file in a GitHub repository.
         Documentation: https://docs.github.com/rest/repos/contents#delete-a-file
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/contents/{quote(file_path)}"
-        github_ref_name = environ["GITHUB_REF_NAME"]
+        url = f"{self.config.repository_url}/contents/{quote(file_path)}"
+
+        if self.batch_commits:
+            return self.stage_file_deletion(file_path)
+
+        self.commit_renames_affecting(file_path)
 
         data = {
             "message": commit_message,
-            "sha": sha or self.get_repository_content(file_path).json().get("sha"),
-            "branch": github_ref_name,
+            "sha": sha or self.get_indexed_content(file_path).json().get("sha"),
+            "branch": self.config.ref_name,
         }
 
-        response = requests.delete(
-            url, json=data, headers=self.get_headers(), timeout=20
-        )
+        response = self.send_contents_write("DELETE", url, file_path, data, expected_sha=None)
 
         if not response.ok:
             print(f"Failed to delete {file_path}")
             print(response.json().get("message"))
             response.raise_for_status()
 
+        repository_index = self.get_repository_index()
+        repository_index.remove(file_path)
+        commit = response.json()["commit"]
+        repository_index.set_head(commit["sha"], commit["tree"]["sha"], [file_path])
+
         # Clear repository content cache
         self.get_repository_content.cache_clear()
+        self.flush_journal()
+
+        return response
+
+    def send_contents_write(
+        self, method: str, url: str, file_path: str, data: dict, expected_sha, applied_status_code=200
+    ) -> requests.Response:
+        """
+        Send a write to the Contents API. These writes aren't idempotent, so after a server error
+        the file is read again to find out whether the write was applied before it's sent again.
+        The expected SHA is the file's blob SHA after the write, or None for a deletion.
+        """
+        for attempt in range(self.max_retries + 1):
+            response = self.session.request(method, url, json=data, headers=self.get_headers(), timeout=20)
+            if response.status_code not in SERVER_ERROR_STATUS_CODES or attempt == self.max_retries:
+                return response
+
+            print(f"GitHub returned {response.status_code} for {method} {file_path}, checking if it was applied")
+            self.session.pause(2**attempt)
+
+            branch_commit = self.get_a_branch(self.config.ref_name)["commit"]
+            if branch_commit["sha"] == self.get_repository_index().commit_sha:
+                # The branch hasn't moved, so the write wasn't applied
+                continue
+
+            content_response = self.get_repository_content(file_path, branch_commit["sha"])
+            current_sha = content_response.json().get("sha") if content_response.ok else None
+            if current_sha == expected_sha:
+                print(f"{method} {file_path} was applied")
+                return self.build_response(
+                    applied_status_code,
+                    {
+                        "content": content_response.json() if content_response.ok else None,
+                        "commit": {"sha": branch_commit["sha"], "tree": branch_commit["commit"]["tree"]},
+                    },
+                )
+
+            # The file was changed by someone else, so write over its current version
+            data = {key: value for key, value in data.items() if key != "sha"}
+            if current_sha:
+                data["sha"] = current_sha
 
         return response
 
@@ -133,33 +1417,35 @@ class GitHubPublisher(guru.PublisherFolders):
         """
         Get a GitHub repository tree by its SHA.
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
         query_parameters = "?recursive=1" if recursive else ""
-        url = f"{github_api_url}/repos/{repository}/git/trees/{tree_sha}{query_parameters}"
+        url = f"{self.config.repository_url}/git/trees/{tree_sha}{query_parameters}"
+
+        response = self.session.get(url, headers=self.get_headers(), timeout=20)
+
+        if not response.ok:
+            print(f"Failed to get tree {tree_sha}")
+            print(response.json().get("message"))
+            response.raise_for_status()
 
-        response = requests.get(url, headers=self.get_headers(), timeout=20)
         results = response.json()
 
         return results
 
-    def create_a_tree(self, tree: list) -> dict:
+    def create_a_tree(self, tree: list, base_tree=None) -> dict:
         """
         Create a tree in a GitHub repository.
+        When a base tree is given, the new tree only needs the entries that changed.
+        Documentation: https://docs.github.com/rest/git/trees#create-a-tree
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/git/trees"
+        url = f"{self.config.repository_url}/git/trees"
 
         data = {
             "tree": tree,
         }
+        if base_tree:
+            data["base_tree"] = base_tree
 
-        session = requests.Session()
-        retries = Retry(total=10, backoff_factor=1, status_forcelist=[502])
-        session.mount("https://", HTTPAdapter(max_retries=retries))
-
-        response = session.post(url, json=data, headers=self.get_headers(), timeout=20)
+        response = self.session.post(url, json=data, headers=self.get_headers(), timeout=20)
 
         if not response.ok:
             print(f"Failed to create a tree: {data}")
@@ -178,52 +1464,97 @@ class GitHubPublisher(guru.PublisherFolders):
 
     def slugify(self, string: str) -> str:
         """
-        Turns a string into a slug.
-        - Convert spaces or repeated dashes to single dashes
-        - Remove characters that aren't alphanumerics, underscores, or hyphens
-        - Convert to lowercase
-        - Strip leading and trailing whitespace, dashes, and underscores
+        Turns a string into a slug. Slugs of recently seen titles are cached.
+        """
+        return slugify(str(string))
+
+    def get_collection_readme(self, collection: guru.Collection) -> str:
+        """
+        Build the README.md that represents a collection in the GitHub repository.
         """
-        string = str(string)
-        string = re.sub(r"[^\w\s-]", "", string.lower())
-        return re.sub(r"[-\s]+", "-", string).strip("-_")
+        return f"# [{collection.name}]({self.get_guru_collection_url(collection)})\n\n{collection.description}"
 
     @lru_cache
     def get_external_collection_path(self, collection: guru.Collection):
         """
         This builds the path to a collection directory in the GitHub repository.
         """
-        external_collection_directory_path = environ["COLLECTION_DIRECTORY_PATH"]
         collection_path = (
-            f"{external_collection_directory_path}/{collection.name}".strip()
+            f"{self.config.collection_directory_path}/{collection.name}".strip()
         )
         return collection_path
 
-    @lru_cache
-    def get_external_folder_path(self, folder: guru.Folder):
+    def get_full_folder(self, folder_id: str) -> guru.Folder:
+        with self.instrumentation.measure("guru get_folder"):
+            return source.get_folder(folder_id)
+
+    def get_home_folder_id(self, folder: guru.Folder) -> str:
+        with self.instrumentation.measure("guru get_home"):
+            return folder.get_home().id
+
+    def get_parent_folder(self, folder: guru.Folder) -> guru.Folder:
+        with self.instrumentation.measure("guru get_parent"):
+            return folder.get_parent()
+
+    def get_folder_node(self, folder_id: str, folder=None):
+        """
+        Get the title and parent folder ID of a folder from the folder hierarchy map.
+        Each folder's parent is only requested from Guru the first time it's needed.
+        """
+        if folder_id not in self.folder_hierarchy:
+            folder = folder or self.unresolved_folders.pop(folder_id, None) or self.get_full_folder(folder_id)
+            parent_folder = self.get_parent_folder(folder)
+            self.folder_hierarchy[folder_id] = (folder.title.strip(), parent_folder.id)
+
+            # Keep the parent so its own parent can be requested without fetching it again
+            if parent_folder.id not in self.folder_hierarchy:
+                self.unresolved_folders[parent_folder.id] = parent_folder
+
+        return self.folder_hierarchy[folder_id]
+
+    def get_external_folder_path_by_id(self, folder_id: str, home_folder_id: str, collection_path: str):
+        """
+        Build the path for a folder by prefixing the paths of its parent folders,
+        using the folder hierarchy map and caching the path of every folder on the way.
+        """
+        if folder_id == home_folder_id:
+            return collection_path
+
+        if folder_id not in self.external_folder_paths:
+            folder_title, parent_folder_id = self.get_folder_node(folder_id)
+            parent_folder_path = self.get_external_folder_path_by_id(
+                parent_folder_id, home_folder_id, collection_path
+            )
+            self.external_folder_paths[folder_id] = f"{parent_folder_path}/{folder_title}"
+
+        return self.external_folder_paths[folder_id]
+
+    def get_external_folder_path(self, folder):
         """
         This builds the path for a folder in the GitHub repository.
+        Accepts a folder or a folder ID. Paths are cached by folder ID.
         """
+        folder_id = getattr(folder, "id", folder)
+        if folder_id in self.external_folder_paths:
+            return self.external_folder_paths[folder_id]
+
         # Ensure we have the full folder object
-        full_folder: guru.Folder = source.get_folder(folder.id)
-        # folder: guru.Folder = guru.Guru.get_folder(folder.id)
+        full_folder = self.get_full_folder(folder_id)
 
-        collection_home_folder: guru.Folder = full_folder.get_home()
+        collection_id = full_folder.collection.id
+        if collection_id not in self.home_folder_ids:
+            self.home_folder_ids[collection_id] = self.get_home_folder_id(full_folder)
+        collection_home_folder_id = self.home_folder_ids[collection_id]
         collection_path: str = self.get_external_collection_path(full_folder.collection)
 
-        if full_folder.id == collection_home_folder.id:
+        if full_folder.id == collection_home_folder_id:
+            self.external_folder_paths[folder_id] = collection_path
             return collection_path
 
-        folder_path: str = full_folder.title.strip()
-        parent_folder: guru.Folder = full_folder.get_parent()
-
-        # Get path by recursively prefixing parent folders to the path
-        while parent_folder.id != collection_home_folder.id:
-            folder_path = f"{parent_folder.title.strip()}/{folder_path}"
-            parent_folder = parent_folder.get_parent()
-
-        full_folder_path = f"{collection_path}/{folder_path}"
-        return full_folder_path
+        self.get_folder_node(full_folder.id, full_folder)
+        return self.get_external_folder_path_by_id(
+            full_folder.id, collection_home_folder_id, collection_path
+        )
 
     @lru_cache
     def get_external_card_path(self, card: guru.Card):
@@ -234,8 +1565,7 @@ class GitHubPublisher(guru.PublisherFolders):
         folders_for_card = card.folders
 
         if folders_for_card:
-            first_folder = source.get_folder(folders_for_card[0])
-            first_folder_path = self.get_external_folder_path(first_folder)
+            first_folder_path = self.get_external_folder_path(folders_for_card[0])
             card_path = f"{first_folder_path}/{self.slugify(card.title)}.md"
         else:
             collection = card.collection
@@ -244,6 +1574,7 @@ class GitHubPublisher(guru.PublisherFolders):
 
         return card_path
 
+    @measured("create_or_update_file_contents")
     def create_or_update_file_contents(
         self,
         guru_id: str,
@@ -256,60 +1587,144 @@ class GitHubPublisher(guru.PublisherFolders):
         Create or update a file in a GitHub repository.
         Documentation: https://docs.github.com/rest/repos/contents#create-or-update-file-contents
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/contents/{quote(file_path)}"
-        github_ref_name = environ["GITHUB_REF_NAME"]
+        url = f"{self.config.repository_url}/contents/{quote(file_path)}"
 
-        file_exists = self.get_repository_content(file_path).ok
-        if file_exists:
-            # SHA is required when updating an existing file
-            sha = sha or self.get_repository_content(file_path).json().get("sha")
+        if self.batch_commits:
+            return self.stage_file_contents(guru_id, file_path, content)
 
-            # Compare the content of the file in the repository to the content
-            # we're trying to publish. If they're the same, don't update the file.
-            # This prevents unnecessary commits to the repository.
-            file_content = self.get_repository_content(file_path).json().get("content")
-            file_content = str(base64.b64decode(file_content), "utf-8")
-            if file_content == content:
-                return self.get_repository_content(file_path)
+        self.commit_renames_affecting(file_path)
 
-        data = {
-            "message": commit_message,
-            "content": str(
-                base64.b64encode(content.encode()),
-                "utf-8",
-            ),
-            "sha": sha,
-            "branch": github_ref_name,
-        }
+        existing_file_response = self.get_published_file(guru_id, file_path)
+        if existing_file_response.ok:
+            existing_sha = existing_file_response.json().get("sha")
+            # SHA is required when updating an existing file
+            sha = sha or existing_sha
+
+            # Compare the blob SHA of the file in the repository to the blob SHA
+            # of the content we're trying to publish. If they're the same, don't
+            # update the file. This prevents unnecessary commits to the repository
+            # without having to download the file.
+            if existing_sha == self.get_git_blob_sha(content):
+                return existing_file_response
+
+        encoded_content = content.encode()
+        if len(encoded_content) > self.large_file_threshold:
+            response = self.commit_large_file(
+                file_path, commit_message, encoded_content, created=not existing_file_response.ok
+            )
+        else:
+            data = {
+                "message": commit_message,
+                "content": str(
+                    base64.b64encode(encoded_content),
+                    "utf-8",
+                ),
+                "sha": sha,
+                "branch": self.config.ref_name,
+            }
 
-        response = requests.put(url, json=data, headers=self.get_headers(), timeout=20)
+            response = self.send_contents_write(
+                "PUT",
+                url,
+                file_path,
+                data,
+                expected_sha=self.get_git_blob_sha(content),
+                applied_status_code=200 if existing_file_response.ok else 201,
+            )
 
-        if not response.ok:
-            print(f"Failed to create or update file contents: {data}")
-            print(response.json().get("message"))
-            response.raise_for_status()
+            if not response.ok:
+                print(f"Failed to create or update file contents: {data}")
+                print(response.json().get("message"))
+                response.raise_for_status()
+
+        repository_index = self.get_repository_index()
+        repository_index.add(file_path, response.json()["content"]["sha"])
+        commit = response.json()["commit"]
+        repository_index.set_head(commit["sha"], commit["tree"]["sha"], [file_path])
 
         if response.status_code == 200:  # OK (Updated)
             self.update_external_metadata(guru_id, response.json())
         elif response.status_code == 201:  # Created
             external_id = self.generate_external_id(guru_id, response.json())
+            self.flush_journal()
             return external_id
 
         # Clear repository content cache
         self.get_repository_content.cache_clear()
+        self.flush_journal()
 
         return response
 
+    def create_a_blob(self, content: bytes) -> str:
+        """
+        Create a Git blob and return its SHA. The content is base64-encoded while it's sent.
+        Documentation: https://docs.github.com/rest/git/blobs#create-a-blob
+        """
+        url = f"{self.config.repository_url}/git/blobs"
+        headers = {**self.get_headers(), "Content-Type": "application/json"}
+
+        response = self.session.post(url, data=BlobUploadBody(content), headers=headers, timeout=60)
+
+        if not response.ok:
+            print(f"Failed to create a blob of {len(content)} bytes")
+            print(response.json().get("message"))
+            response.raise_for_status()
+
+        return response.json()["sha"]
+
+    def commit_large_file(self, file_path: str, commit_message: str, content: bytes, created: bool):
+        """
+        Commit a file that's too large for the Contents API by uploading it as a blob
+        and creating a tree, a commit, and a reference update for it.
+        Returns a response with the same shape as create_or_update_file_contents.
+        """
+        github_ref = self.config.ref
+        repository_index = self.get_repository_index()
+
+        blob_sha = self.create_a_blob(content)
+        new_tree = self.create_a_tree(
+            [{"path": file_path, "mode": "100644", "type": "blob", "sha": blob_sha}],
+            base_tree=repository_index.tree_sha,
+        )
+        commit_sha = self.create_a_commit(
+            commit_message, new_tree.get("sha"), [repository_index.commit_sha]
+        ).get("sha")
+        self.update_a_reference(github_ref, commit_sha)
+
+        repository_index.add(file_path, blob_sha)
+        return self.build_response(
+            201 if created else 200,
+            {
+                "content": self.get_indexed_content(file_path).json(),
+                "commit": {"sha": commit_sha, "tree": {"sha": new_tree.get("sha")}},
+            },
+        )
+
+    def get_tree_entry(self, change: dict) -> dict:
+        """
+        Get the tree entry for a batched change. Large files are uploaded as blobs
+        first and referenced by their SHA, so they aren't sent inline in the tree.
+        """
+        if "content" not in change:
+            return change
+
+        content = change["content"].encode()
+        if len(content) <= self.large_file_threshold:
+            return change
+
+        return {
+            "path": change["path"],
+            "mode": change["mode"],
+            "type": change["type"],
+            "sha": self.create_a_blob(content),
+        }
+
     def create_a_commit(self, message: str, tree_sha, parents: List[str]) -> dict:
         """
         Create a new Git commit object.
         Documentation: https://docs.github.com/rest/git/commits#create-a-commit
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/git/commits"
+        url = f"{self.config.repository_url}/git/commits"
 
         data = {
             "message": message,
@@ -317,7 +1732,7 @@ class GitHubPublisher(guru.PublisherFolders):
             "parents": parents,
         }
 
-        response = requests.post(url, json=data, headers=self.get_headers(), timeout=20)
+        response = self.session.post(url, json=data, headers=self.get_headers(), timeout=20)
 
         if not response.ok:
             print(f"Failed to create a commit: {data}")
@@ -332,11 +1747,14 @@ class GitHubPublisher(guru.PublisherFolders):
         """
         Get a Git branch object.
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/branches/{branch}"
+        url = f"{self.config.repository_url}/branches/{branch}"
 
-        response = requests.get(url, headers=self.get_headers(), timeout=20)
+        response = self.session.get(url, headers=self.get_headers(), timeout=20)
+
+        if not response.ok:
+            print(f"Failed to get branch {branch}")
+            print(response.json().get("message"))
+            response.raise_for_status()
 
         results = response.json()
 
@@ -346,11 +1764,9 @@ class GitHubPublisher(guru.PublisherFolders):
         """
         Get a Git commit object.
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/commits/{ref}"
+        url = f"{self.config.repository_url}/commits/{ref}"
 
-        response = requests.get(
+        response = self.session.get(
             url, headers=self.get_headers("application/vnd.github.sha"), timeout=20
         )
 
@@ -360,61 +1776,40 @@ class GitHubPublisher(guru.PublisherFolders):
 
     def get_external_path_by_sha(self, sha):
         """
-        Attempt to find the path of a file in the repository HEAD by its blob SHA.
+        Attempt to find the path of a file in the collection directory by its blob SHA.
         This can help the script recover when the metadata file is not in sync with the repository.
         """
-        # List all files in the current commit of the current branch recursively
-        git_process = subprocess.run(
-            ["/usr/bin/git", "ls-tree", "-r", "HEAD"],
-            check=True,
-            text=True,
-            capture_output=True,
-        )  # nosec B603
+        directory_prefix = f"{self.config.collection_directory_path.strip('/')}/"
 
-        try:
-            # Find the line that contains the SHA
-            grep_process = subprocess.run(
-                ["/usr/bin/grep", sha],
-                input=git_process.stdout,
-                check=True,
-                text=True,
-                capture_output=True,
-            )  # nosec B603
-        except subprocess.CalledProcessError:
+        # The SHA must match exactly, and only files in the collection directory are considered
+        matching_paths = [
+            file_path
+            for file_path in self.get_repository_index().find_paths_by_sha(sha)
+            if file_path.startswith(directory_prefix)
+        ]
+
+        if not matching_paths:
             print(f"SHA {sha} not found in the repository")
             return None
 
-        # Extract the path from the line with the SHA
-        cut_process = subprocess.run(
-            ["/usr/bin/cut", "-f", "2"],
-            input=grep_process.stdout,
-            check=True,
-            text=True,
-            capture_output=True,
-        )  # nosec B603
-
-        # We get a relative path because this script is run from the collection directory
-        relative_path = cut_process.stdout.strip()
-
-        collection_directory_path = environ["COLLECTION_DIRECTORY_PATH"]
+        if len(matching_paths) > 1:
+            print(f"SHA {sha} found at more than one path, using {matching_paths[0]}")
 
         # Return the full path so it can be passed to the GitHub API
-        return path.join(collection_directory_path, relative_path)
+        return matching_paths[0]
 
     def update_a_reference(self, ref: str, sha):
         """
         Update a Git reference.
         Documentation: https://docs.github.com/rest/git/refs#update-a-reference
         """
-        github_api_url = environ["GITHUB_API_URL"]
-        repository = environ["GITHUB_REPOSITORY"]
-        url = f"{github_api_url}/repos/{repository}/git/{ref}"
+        url = f"{self.config.repository_url}/git/{ref}"
 
         data = {
             "sha": sha,
         }
 
-        response = requests.patch(
+        response = self.session.patch(
             url, json=data, headers=self.get_headers(), timeout=20
         )
 
@@ -428,57 +1823,292 @@ class GitHubPublisher(guru.PublisherFolders):
 
         return response
 
+    @measured("rename_file_or_directory")
     def rename_file_or_directory(
         self, guru_id: str, old_path: str, new_path: str, commit_message: str
     ):
         """
         Rename a file or directory in a GitHub repository.
+        Metadata for the new path is read from the repository index, which
+        is updated with the rename, so GitHub does not have to be read again.
         """
-        github_ref = environ["GITHUB_REF"]
-        github_ref_name = environ["GITHUB_REF_NAME"]
-        latest_commit_sha = self.get_a_branch(github_ref_name).get("commit").get("sha")
+        # Renames are staged as a delta against the current tree. Outside of batch mode,
+        # consecutive renames are committed together before a file they affect is written.
+        update_a_reference_response = self.stage_rename(old_path, new_path)
+        self.batched_commit_messages.append(commit_message)
 
-        base_tree = self.get_a_tree(latest_commit_sha, recursive=True)
-        base_tree_sha = base_tree.get("sha")
+        guru_object_type = self.get_type(guru_id)
+        if guru_object_type == "collection":
+            new_path = f"{new_path}/README.md"
 
-        new_tree_structure = [
-            {
-                "path": item["path"].replace(
-                    old_path,
-                    new_path,
-                ),
-                "mode": item["mode"],
-                "type": item["type"],
-                "sha": item["sha"],
+        content_response = self.get_indexed_content(new_path)
+        if not content_response.ok:
+            print(f"Failed to get external metadata for renamed {guru_object_type} ('{old_path}' → '{new_path}')")
+            print(content_response.json().get("message"))
+            content_response.raise_for_status()
+
+        self.update_external_metadata(guru_id, content_response.json())
+
+        return update_a_reference_response
+
+    def stage_file_contents(self, guru_id: str, file_path: str, content: str):
+        """
+        Stage a created or updated file to be committed with the rest of the batch.
+        Returns the same values as create_or_update_file_contents.
+        """
+        existing_file_response = self.get_published_file(guru_id, file_path)
+        if existing_file_response.ok:
+            # Don't stage files whose content is unchanged
+            if existing_file_response.json().get("sha") == self.get_git_blob_sha(content):
+                return existing_file_response
+
+        self.batched_changes[file_path] = {
+            "path": file_path,
+            "mode": "100644",
+            "type": "blob",
+            "content": content,
+        }
+        self.get_repository_index().add(file_path, self.get_git_blob_sha(content))
+        response_json = self.get_indexed_content(file_path).json()
+
+        if existing_file_response.ok:
+            self.update_external_metadata(guru_id, response_json)
+            return self.build_response(200, response_json)
+
+        return self.generate_external_id(guru_id, response_json)
+
+    def stage_file_deletion(self, file_path: str):
+        """
+        Stage a file deletion to be committed with the rest of the batch.
+        """
+        repository_index = self.get_repository_index()
+        entry = repository_index.remove(file_path)
+
+        if file_path in repository_index.base_paths:
+            # Deleted files are tree entries with a null SHA
+            self.batched_changes[file_path] = {
+                "path": file_path,
+                "mode": entry["mode"] if entry else "100644",
+                "type": "blob",
+                "sha": None,
             }
-            for item in filter(lambda x: x["type"] == "blob", base_tree["tree"])
-        ]
+        else:
+            # The file was created during this run, so there is nothing to delete
+            self.batched_changes.pop(file_path, None)
+
+        return self.build_response(200, {"path": file_path})
+
+    def stage_rename(self, old_path: str, new_path: str):
+        """
+        Stage moving a file or every file in a directory to a new path.
+        """
+        repository_index = self.get_repository_index()
+        if repository_index.truncated:
+            print(f"Repository tree is truncated, some files in '{old_path}' may not be moved")
+
+        for file_path in repository_index.list_files(old_path):
+            moved_path = f"{new_path}{file_path[len(old_path):]}"
+            entry = repository_index.get(file_path)
+            moved_entry = {"path": moved_path, "mode": entry["mode"], "type": "blob"}
+
+            # Files created during this run are moved with their content
+            staged_entry = self.batched_changes.get(file_path, {})
+            if "content" in staged_entry:
+                moved_entry["content"] = staged_entry["content"]
+            else:
+                moved_entry["sha"] = entry["sha"]
+
+            self.stage_file_deletion(file_path)
+            self.batched_changes[moved_path] = moved_entry
+            repository_index.add(moved_path, entry["sha"], entry["mode"])
+
+        return self.build_response(200, {"path": new_path})
 
-        new_tree = self.create_a_tree(new_tree_structure)
-        new_tree_sha = new_tree.get("sha")
+    @measured("commit_batched_changes")
+    def commit_batched_changes(self, commit_message: str):
+        """
+        Commit every batched change with one tree, one commit, and one reference update.
+        """
+        if not self.batched_changes:
+            print("No changes to commit")
+            return None
+
+        if self.publish_backend == "git":
+            # The changes are committed with the metadata by commit_and_push
+            return self.write_batched_changes()
 
+        github_ref = self.config.ref
+        repository_index = self.get_repository_index()
+
+        new_tree = self.create_a_tree(
+            [self.get_tree_entry(change) for change in self.batched_changes.values()],
+            base_tree=repository_index.tree_sha,
+        )
         commit_sha = self.create_a_commit(
-            commit_message, new_tree_sha, [base_tree_sha]
+            commit_message, new_tree.get("sha"), [repository_index.commit_sha]
         ).get("sha")
 
         update_a_reference_response = self.update_a_reference(github_ref, commit_sha)
 
-        guru_object_type = self.get_type(guru_id)
-        if guru_object_type == "collection":
-            new_path = f"{new_path}/README.md"
+        print(f"Committed {len(self.batched_changes)} changes in {commit_sha}")
+        # The index already includes the batched changes
+        repository_index.set_head(commit_sha, new_tree.get("sha"), self.batched_changes)
+        self.batched_changes = {}
+        self.batched_commit_messages = []
+        self.flush_journal()
+
+        return update_a_reference_response
 
-        # Wait a second for the reference to be updated
-        time.sleep(1)
+    def run_git(self, arguments: List[str], input=None) -> bytes:
+        """
+        Run a Git command in the working directory and return its output.
+        """
+        with self.instrumentation.measure(f"git {arguments[0]}"):
+            process = subprocess.run(
+                ["/usr/bin/git"] + arguments,
+                input=input,
+                check=True,
+                capture_output=True,
+            )  # nosec B603
+        return process.stdout
+
+    def get_local_tree(self):
+        """
+        Get the commit SHA and recursive tree of the local checkout's HEAD,
+        in the same shape as the recursive tree from the GitHub API.
+        """
+        commit_sha, tree_sha = self.run_git(["rev-parse", "HEAD", "HEAD^{tree}"]).decode().split()
+        entries = []
+        # Each entry is <mode> SP <type> SP <sha> TAB <path> NUL
+        for entry in self.run_git(["ls-tree", "-r", "-t", "-z", "--full-tree", "HEAD"]).decode().split("\0"):
+            if entry:
+                object_info, file_path = entry.split("\t", 1)
+                mode, object_type, sha = object_info.split()
+                entries.append({"path": file_path, "mode": mode, "type": object_type, "sha": sha})
+
+        return commit_sha, {"sha": tree_sha, "tree": entries, "truncated": False}
+
+    def read_blobs(self, shas) -> dict:
+        """
+        Read the content of Git blobs from the local object database with one `git cat-file`.
+        """
+        shas = sorted(set(shas))
+        if not shas:
+            return {}
+
+        output = self.run_git(["cat-file", "--batch"], input="".join(f"{sha}\n" for sha in shas).encode())
+        blobs = {}
+        position = 0
+        # Each object is <sha> SP <type> SP <size> LF <content> LF
+        for sha in shas:
+            header_end = output.index(b"\n", position)
+            size = int(output[position:header_end].split()[2])
+            blobs[sha] = output[header_end + 1 : header_end + 1 + size]
+            position = header_end + size + 2
+
+        return blobs
+
+    def write_batched_changes(self):
+        """
+        Write every batched change to the working tree and stage it for commit.
+        Moved files that weren't changed are read from the local object database.
+        """
+        repository_root = self.run_git(["rev-parse", "--show-toplevel"]).decode().strip()
+        changes = list(self.batched_changes.values())
+        blobs = self.read_blobs(
+            change["sha"] for change in changes if "content" not in change and change.get("sha")
+        )
+
+        # Delete first, so a file moved to the path of a deleted file isn't removed
+        for change in changes:
+            if "content" not in change and change.get("sha") is None:
+                file_path = path.join(repository_root, change["path"])
+                if path.exists(file_path):
+                    remove(file_path)
+
+        for change in changes:
+            if "content" in change:
+                content = change["content"].encode()
+            elif change.get("sha"):
+                content = blobs[change["sha"]]
+            else:
+                continue
+
+            file_path = path.join(repository_root, change["path"])
+            makedirs(path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as file:
+                file.write(content)
+
+        self.run_git(
+            ["-C", repository_root, "add", "--all", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            input="".join(f"{change['path']}\0" for change in changes).encode(),
+        )
+
+        print(f"Wrote {len(changes)} changes to the working tree")
+        # Later batches are based on the working tree
+        self.get_repository_index().update_base_paths(self.batched_changes)
+        self.batched_changes = {}
+        self.batched_commit_messages = []
+
+    def commit_and_push(self, commit_message: str):
+        """
+        Commit the staged cards, images, and metadata in one commit and push it.
+        If the branch moved on since it was checked out, the commit is rebased onto it once.
+        """
+        repository_root = self.run_git(["rev-parse", "--show-toplevel"]).decode().strip()
+        # Images were staged by stage_images, which may have changed the Git LFS attributes
+        metadata_paths = [
+            file_path
+            for file_path in (
+                self.metadata_store.file_path,
+                self.journal.file_path,
+                self.image_manifest_path,
+                path.join(repository_root, ".gitattributes"),
+            )
+            if path.exists(file_path)
+        ]
+        if metadata_paths:
+            self.run_git(["add", "--"] + metadata_paths)
+
+        if not self.run_git(["diff", "--cached", "--name-only"]).strip():
+            print("No changes to commit")
+            return None
+
+        self.run_git(["commit", "--quiet", "--message", commit_message])
+        github_ref = self.config.ref
+        try:
+            self.run_git(["push", "--quiet", "origin", f"HEAD:{github_ref}"])
+        except subprocess.CalledProcessError:
+            print("Push was rejected, rebasing onto the latest commit and trying again")
+            self.run_git(["pull", "--quiet", "--rebase", "origin", github_ref])
+            self.run_git(["push", "--quiet", "origin", f"HEAD:{github_ref}"])
+
+        commit_sha = self.run_git(["rev-parse", "HEAD"]).decode().strip()
+        print(f"Pushed {commit_sha}")
+        return commit_sha
+
+    def commit_renames(self):
+        """
+        Commit renames that have been staged outside of batch mode as one commit.
+        """
+        if not self.batched_changes:
+            return None
 
-        content_response = self.get_repository_content(new_path)
-        if not content_response.ok:
-            print(f"Failed to get external metadata for renamed {guru_object_type} ('{old_path}' → '{new_path}')")
-            print(content_response.json().get("message"))
-            content_response.raise_for_status()
+        if len(self.batched_commit_messages) == 1:
+            commit_message = self.batched_commit_messages[0]
+        else:
+            commit_message = f"Rename {len(self.batched_commit_messages)} files and directories\n\n" + "\n".join(
+                f"- {message}" for message in self.batched_commit_messages
+            )
 
-        self.update_external_metadata(guru_id, content_response.json())
+        return self.commit_batched_changes(commit_message)
 
-        return update_a_reference_response
+    def commit_renames_affecting(self, file_path: str):
+        """
+        Commit staged renames before writing a file that one of them moved.
+        """
+        if file_path in self.batched_changes:
+            self.commit_renames()
 
     def get_external_url(self, external_id, card: guru.Card):
         """
@@ -498,7 +2128,7 @@ class GitHubPublisher(guru.PublisherFolders):
         with the same name. Guru collections are folders in a GitHub repository.
         """
         expected_path = f"{self.get_external_collection_path(collection)}/README.md"
-        response = self.get_repository_content(expected_path)
+        response = self.get_indexed_content(expected_path)
 
         if response.ok:
             external_id = self.get_metadata(collection.id).get(
@@ -519,7 +2149,7 @@ class GitHubPublisher(guru.PublisherFolders):
             collection.id,
             f"{collection_path}/README.md",
             f"Create {collection.name} collection",
-            f"# [{collection.name}]({self.get_guru_collection_url(collection)})\n\n{collection.description}",
+            self.get_collection_readme(collection),
         )
 
     def update_external_collection(self, external_id, collection: guru.Collection):
@@ -544,18 +2174,13 @@ class GitHubPublisher(guru.PublisherFolders):
 
             if rename_response.ok:
                 # Replace old collection path with new collection path in metadata file
-                for _guru_id, metadata in self._PublisherFolders__metadata.items():
-                    if metadata.get("external_path"):
-                        metadata["external_path"] = metadata["external_path"].replace(
-                            f"{old_collection_path}/",
-                            f"{new_collection_path}/",
-                        )
+                self.move_external_paths(old_collection_path, new_collection_path)
 
         return self.create_or_update_file_contents(
             collection.id,
             f"{new_collection_path}/README.md",
             "Update collection details",
-            f"# [{collection.name}]({self.get_guru_collection_url(collection)})\n\n{collection.description}",
+            self.get_collection_readme(collection),
         )
 
     def delete_external_collection(self, external_id):
@@ -581,7 +2206,7 @@ class GitHubPublisher(guru.PublisherFolders):
         one at the expected path.
         """
         expected_path = self.get_external_folder_path(folder)
-        response = self.get_repository_content(expected_path)
+        response = self.get_indexed_content(expected_path)
 
         if response.ok:
             external_id = self.get_metadata(folder.id).get(
@@ -618,9 +2243,9 @@ class GitHubPublisher(guru.PublisherFolders):
         alt_folder_path = f"{path.dirname(new_folder_path)}/{old_folder_name}"
 
         external_folder_response = (
-            self.get_repository_content(new_folder_path)
-            or self.get_repository_content(old_folder_path)
-            or self.get_repository_content(alt_folder_path)
+            self.get_indexed_content(new_folder_path)
+            or self.get_indexed_content(old_folder_path)
+            or self.get_indexed_content(alt_folder_path)
         )
 
         if external_folder_response.ok:
@@ -641,7 +2266,7 @@ class GitHubPublisher(guru.PublisherFolders):
                 else f"Update {new_folder_name} path"
             )
 
-            new_folder_path_available = not self.get_repository_content(
+            new_folder_path_available = not self.get_indexed_content(
                 new_folder_path
             ).ok
 
@@ -655,14 +2280,7 @@ class GitHubPublisher(guru.PublisherFolders):
 
                 if rename_response.ok:
                     # Replace old folder path with new folder path in metadata file
-                    for _guru_id, metadata in self._PublisherFolders__metadata.items():
-                        if metadata.get("external_path"):
-                            metadata["external_path"] = metadata[
-                                "external_path"
-                            ].replace(
-                                f"{current_folder_path}/",
-                                f"{new_folder_path}/",
-                            )
+                    self.move_external_paths(current_folder_path, new_folder_path)
 
                 return rename_response
 
@@ -680,7 +2298,7 @@ class GitHubPublisher(guru.PublisherFolders):
         file with the same name.
         """
         expected_path = self.get_external_card_path(card)
-        response = self.get_repository_content(expected_path)
+        response = self.get_indexed_content(expected_path)
 
         if response.ok:
             external_id = self.get_metadata(card.id).get(
@@ -688,11 +2306,747 @@ class GitHubPublisher(guru.PublisherFolders):
             ) or self.generate_external_id(card.id, response.json())
             return external_id
 
-    def convert_card_content(self, card: guru.Card):
+    @measured("publish_collection")
+    def publish_collection(self, collection):
         """
-        Convert card content to be more GitHub-flavored Markdown friendly.
+        Publish a Guru collection. When more than one worker is configured,
+        cards are rendered ahead of time before the SDK publishes them in order,
+        and the cards of the next collection start rendering in the meantime.
+        """
+        if self.card_executor and not self.dry_run:
+            self.prefetch_card_content(collection)
+            if collection in self.collection_order[:-1]:
+                self.prefetch_card_content(self.collection_order[self.collection_order.index(collection) + 1])
+
+        start_time = time.perf_counter()
+        try:
+            result = super().publish_collection(collection)
+        finally:
+            self.record_timing(collection, "publish", time.perf_counter() - start_time)
+
+        if self.card_executor and not self.dry_run:
+            self.discard_unused_renders(collection)
+            # The collection's cards aren't needed anymore, so they aren't kept in memory
+            self.collection_cards.pop(collection, None)
+        return result
+
+    def find_collection_cards(self, collection_id: str):
+        """
+        Get every card in a collection. Cards are only listed once per collection per run.
+        """
+        if collection_id not in self.collection_cards:
+            start_time = time.perf_counter()
+            with self.instrumentation.measure("guru find_cards"):
+                self.collection_cards[collection_id] = source.find_cards(collection=collection_id)
+            self.record_timing(collection_id, "fetch", time.perf_counter() - start_time)
+
+        return self.collection_cards[collection_id]
+
+    def find_all_collection_cards(self, collection_ids: List[str]):
+        """
+        List the cards of several collections at the same time on the worker threads.
+        """
+        if not self.card_executor:
+            return None
+
+        for future in [
+            self.card_executor.submit(self.find_collection_cards, collection_id)
+            for collection_id in collection_ids
+        ]:
+            future.result()
+
+    def map_reads(self, function, items) -> list:
+        """
+        Call a function that only reads from Guru or GitHub with each item,
+        concurrently when a read concurrency is configured. The function must not
+        call map_reads itself, or the read workers can end up waiting on each other.
+        """
+        if self.read_executor is None:
+            return [function(item) for item in items]
+        return list(self.read_executor.map(function, items))
+
+    def prefetch_reads(self, collection_ids: List[str]):
+        """
+        Read what a sync needs before anything is published: the repository tree, the cards
+        of every collection, and the path of every folder the cards are in. With a read
+        concurrency above one, independent reads are made at the same time.
+        """
+        if self.read_executor is None:
+            return self.find_all_collection_cards(collection_ids)
+
+        self.map_reads(
+            lambda read: read(),
+            [self.get_repository_index]
+            + [partial(self.find_collection_cards, collection_id) for collection_id in collection_ids],
+        )
+
+        folder_ids = {
+            getattr(folder, "id", folder)
+            for collection_id in collection_ids
+            for card in self.collection_cards[collection_id]
+            for folder in (card.folders or [])[:1]
+        }
+        self.resolve_folder_paths(folder_ids)
+
+        self.check_missing_paths(
+            self.get_external_card_path(card)
+            for collection_id in collection_ids
+            for card in self.collection_cards[collection_id]
+        )
+
+    def check_missing_paths(self, file_paths):
+        """
+        Check if paths that are missing from a truncated repository tree exist, at the same time,
+        before the SDK looks for them. Each result is only used by the first lookup of its path.
+        """
+        repository_index = self.get_repository_index()
+        if not repository_index.truncated:
+            return None
+
+        file_paths = sorted({file_path for file_path in file_paths if not repository_index.exists(file_path)})
+        responses = self.map_reads(partial(self.get_repository_content, ref=repository_index.commit_sha), file_paths)
+        self.checked_contents.update(zip(file_paths, responses))
+
+    def resolve_folder_paths(self, folder_ids):
+        """
+        Build the paths of many folders with as few rounds of concurrent requests as possible:
+        one to get every folder, one to find the home folder of each collection, and one per
+        level of the folder hierarchy to get the parents of every folder on that level.
+        The folder hierarchy and paths are cached as get_external_folder_path would cache them.
+        """
+        folder_ids = sorted(folder_id for folder_id in folder_ids if folder_id not in self.external_folder_paths)
+        full_folders = self.map_reads(self.get_full_folder, folder_ids)
+
+        home_folders = {}
+        for full_folder in full_folders:
+            if full_folder.collection.id not in self.home_folder_ids:
+                home_folders.setdefault(full_folder.collection.id, full_folder)
+        for collection_id, home_folder_id in zip(
+            home_folders, self.map_reads(self.get_home_folder_id, home_folders.values())
+        ):
+            self.home_folder_ids[collection_id] = home_folder_id
+
+        # Walk up the hierarchy one level at a time, until the home folder or a known folder is reached
+        level = {
+            full_folder.id: (full_folder, self.home_folder_ids[full_folder.collection.id])
+            for full_folder in full_folders
+            if full_folder.id != self.home_folder_ids[full_folder.collection.id]
+            and full_folder.id not in self.folder_hierarchy
+        }
+        while level:
+            folders = list(level.values())
+            parent_folders = self.map_reads(self.get_parent_folder, [folder for folder, _ in folders])
+
+            level = {}
+            for (folder, home_folder_id), parent_folder in zip(folders, parent_folders):
+                self.folder_hierarchy[folder.id] = (folder.title.strip(), parent_folder.id)
+                if parent_folder.id != home_folder_id and parent_folder.id not in self.folder_hierarchy:
+                    level[parent_folder.id] = (parent_folder, home_folder_id)
+
+        for folder_id, full_folder in zip(folder_ids, full_folders):
+            home_folder_id = self.home_folder_ids[full_folder.collection.id]
+            collection_path = self.get_external_collection_path(full_folder.collection)
+            self.external_folder_paths[folder_id] = self.get_external_folder_path_by_id(
+                full_folder.id, home_folder_id, collection_path
+            )
+
+    def prefetch_collections(self, collection_ids: List[str]):
+        """
+        Start fetching the cards of every collection and rendering the cards of the first one
+        before any of them are published. Each collection starts rendering the next one when
+        it's published, so rendered cards and their images are held for at most two collections.
+        Collections are still published one at a time, so all writes happen in order.
+        """
+        if not self.card_executor or self.dry_run:
+            return None
+
+        self.collection_order = list(collection_ids)
+        self.find_all_collection_cards(collection_ids)
+        if collection_ids:
+            self.prefetch_card_content(collection_ids[0])
+
+    def record_timing(self, collection_id: str, phase: str, seconds: float):
+        """
+        Add time spent in a phase of publishing a collection.
+        """
+        with self.timings_lock:
+            collection_timings = self.collection_timings.setdefault(collection_id, {})
+            collection_timings[phase] = collection_timings.get(phase, 0.0) + seconds
+
+    def summarize_timings(self) -> str:
+        """
+        Summarize the time spent on each collection. Render time is the total time spent
+        by the worker threads, so it can be longer than the time the run took.
+        """
+        return "\n".join(
+            f"Collection {collection_id}: "
+            + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in collection_timings.items())
+            for collection_id, collection_timings in self.collection_timings.items()
+        )
+
+    @measured("process_deletions")
+    def process_deletions(self, *args, **kwargs):
+        return super().process_deletions(*args, **kwargs)
+
+    def write_instrumentation_report(self):
+        """
+        Write the instrumentation report as JSON to INSTRUMENTATION_REPORT_PATH, if it's set,
+        and add a summary of it to the GitHub Actions job summary.
+        """
+        caches = {
+            name: getattr(self, name).cache_info()
+            for name in (
+                "get_repository_content",
+                "get_a_tree",
+                "get_external_collection_path",
+                "get_external_card_path",
+            )
+        }
+        caches["slugify"] = slugify.cache_info()
+        report = self.instrumentation.build_report(caches, self.session)
+
+        report_path = environ.get("INSTRUMENTATION_REPORT_PATH")
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+                file.write("\n")
+
+        step_summary_path = environ.get("GITHUB_STEP_SUMMARY")
+        if step_summary_path:
+            with open(step_summary_path, "a", encoding="utf-8") as file:
+                file.write(self.instrumentation.format_job_summary(report))
+
+        return report
+
+    def plan_sync(self, collection_ids: List[str]) -> dict:
+        """
+        Compute every change a sync of the collections would make to the repository, without
+        writing anything. The repository is read once as a recursive tree, and the blob SHA of
+        each file is computed locally and compared to the tree. Cards that haven't changed since
+        they were last published aren't rendered again. Like process_deletions, every published
+        card or collection that isn't in the given collections is planned to be deleted.
+        """
+        repository_index = self.get_repository_index()
+        planned_ids = set()
+        rendered_cards = {}
+        changes = []
+
+        for collection_id in collection_ids:
+            with self.instrumentation.measure("guru get_collection"):
+                collection: guru.Collection = source.get_collection(collection_id)
+            planned_ids.add(collection.id)
+            changes.append(
+                self.plan_file(
+                    collection.id,
+                    "collection",
+                    collection.name,
+                    f"{self.get_external_collection_path(collection)}/README.md",
+                    self.get_git_blob_sha(self.get_collection_readme(collection)),
+                )
+            )
+
+            cards = self.find_collection_cards(collection_id)
+            for card in cards:
+                # Unverified cards aren't published, so their published files are planned as deletes
+                if self.skip_unverified_cards and getattr(card, "verification_state", "TRUSTED") != "TRUSTED":
+                    continue
+
+                planned_ids.add(card.id)
+
+                metadata = self.get_metadata(card.id)
+                last_modified = getattr(card, "last_modified", None)
+                if (
+                    last_modified
+                    and last_modified == metadata.get("published_last_modified")
+                    and metadata.get("published_content_format") == self.content_format
+                ):
+                    # The published file is up to date if it wasn't changed in the repository
+                    continue
+
+                render = partial(self.render_card_content, card, download_images=False)
+                rendered_cards[card.id] = self.card_executor.submit(render) if self.card_executor else render
+
+            for card in cards:
+                if self.skip_unverified_cards and getattr(card, "verification_state", "TRUSTED") != "TRUSTED":
+                    continue
+
+                rendered_card = rendered_cards.pop(card.id, None)
+                if rendered_card is None:
+                    sha = self.get_metadata(card.id).get("external_sha")
+                    images = []
+                else:
+                    content, images = rendered_card.result() if self.card_executor else rendered_card()
+                    sha = self.get_git_blob_sha(content)
+
+                change = self.plan_file(card.id, "card", card.title, self.get_external_card_path(card), sha)
+                change["images"] = sum(
+                    1
+                    for _downloaded_path, image_download_path, record in images
+                    if self.image_manifest.get(image_download_path, {}).get("url") != record["url"]
+                )
+                changes.append(change)
+
+        for guru_id, metadata in sorted(self._PublisherFolders__metadata.items()):
+            external_path = metadata.get("external_path")
+            if guru_id in planned_ids or not external_path or self.get_type(guru_id) == "folder":
+                continue
+            if repository_index.is_file(external_path):
+                changes.append(
+                    {
+                        "action": "delete",
+                        "type": self.get_type(guru_id),
+                        "guru_id": guru_id,
+                        "title": metadata.get("external_name"),
+                        "path": external_path,
+                        "sha": metadata.get("external_sha"),
+                    }
+                )
+
+        summary = {action: 0 for action in ("create", "update", "rename", "move", "delete", "unchanged")}
+        for change in changes:
+            summary[change["action"]] += 1
+
+        return {
+            "repository": {
+                "commit": repository_index.commit_sha,
+                "truncated": repository_index.truncated,
+            },
+            "summary": summary,
+            "images": sum(change.get("images", 0) for change in changes),
+            "changes": [change for change in changes if change["action"] != "unchanged"],
+        }
+
+    def plan_file(self, guru_id: str, object_type: str, title: str, file_path: str, sha) -> dict:
+        """
+        Plan the change to the file of a collection or card. The file is expected at the path in its
+        metadata, or found by its last published blob SHA if it isn't there. A planned SHA of None
+        means the card wasn't rendered because it hasn't changed since it was last published.
+        """
+        repository_index = self.get_repository_index()
+        metadata = self.get_metadata(guru_id)
+        change = {"type": object_type, "guru_id": guru_id, "title": title, "path": file_path}
+
+        old_path = metadata.get("external_path")
+        if not (old_path and repository_index.is_file(old_path)) and metadata.get("external_sha"):
+            old_path = next(iter(repository_index.find_paths_by_sha(metadata["external_sha"])), None)
+        if not (old_path and repository_index.is_file(old_path)):
+            # The file may exist without metadata, in which case it's updated in place
+            old_path = file_path if repository_index.is_file(file_path) else None
+
+        if old_path is None:
+            return {**change, "action": "create", "sha": sha}
+
+        old_sha = repository_index.get(old_path)["sha"]
+        sha = sha or metadata.get("external_sha")
+        if old_path == file_path:
+            action = "unchanged" if sha == old_sha else "update"
+        else:
+            action = "rename" if path.dirname(old_path) == path.dirname(file_path) else "move"
+
+        return {
+            **change,
+            "action": action,
+            "old_path": old_path,
+            "sha": sha,
+            "old_sha": old_sha,
+            "content_changed": sha != old_sha,
+        }
+
+    def write_plan(self, plan: dict):
+        """
+        Print the planned changes, write the plan as JSON to PLAN_PATH if it's set,
+        and add a summary of it to the GitHub Actions job summary.
+        """
+        for change in plan["changes"]:
+            if change["action"] in ("rename", "move"):
+                print(f"{change['action']:<8} {change['old_path']} → {change['path']}")
+            else:
+                print(f"{change['action']:<8} {change['path']}")
+
+        summary = ", ".join(f"{count} to {action}" for action, count in plan["summary"].items() if action != "unchanged")
+        summary_line = f"Plan: {summary}, {plan['summary']['unchanged']} unchanged, {plan['images']} images to download"
+        print(summary_line)
+
+        plan_path = environ.get("PLAN_PATH")
+        if plan_path:
+            with open(plan_path, "w", encoding="utf-8") as file:
+                json.dump(plan, file, indent=2)
+                file.write("\n")
+
+        step_summary_path = environ.get("GITHUB_STEP_SUMMARY")
+        if step_summary_path:
+            with open(step_summary_path, "a", encoding="utf-8") as file:
+                file.write(f"## Sync plan\n\n{summary_line}\n\n")
+
+    def get_collection(self, collection_id: str) -> guru.Collection:
+        with self.instrumentation.measure("guru get_collection"):
+            return source.get_collection(collection_id)
+
+    def get_details_digest(self, collection: guru.Collection) -> str:
+        """
+        Get a digest that changes when a collection's details change.
+        """
+        return hashlib.sha256(f"{collection.name}\0{collection.description}".encode()).hexdigest()
+
+    def get_sync_state(self, collection_id: str):
+        """
+        Summarize the state of a Guru collection after listing all of its cards, so it can be
+        compared to the last full sync. The watermark is the latest lastModified time of its
+        cards, and the digest changes when cards are added, removed, moved, or unverified.
+        """
+        collection = self.get_collection(collection_id)
+        digest = hashlib.sha256(f"{collection.name}\0{collection.description}".encode())
+        watermark = ""
+
+        for card in sorted(self.find_collection_cards(collection_id), key=lambda card: card.id):
+            watermark = max(watermark, getattr(card, "last_modified", None) or "")
+            folder_ids = ",".join(getattr(folder, "id", folder) for folder in card.folders or [])
+            verification_state = getattr(card, "verification_state", "")
+            digest.update(f"\0{card.id}:{folder_ids}:{verification_state}".encode())
+
+        return collection.id, {
+            "sync_watermark": watermark,
+            "sync_digest": digest.hexdigest(),
+            "sync_details_digest": self.get_details_digest(collection),
+        }
+
+    def find_modified_cards(self, collection_id: str, watermark: str) -> list:
+        """
+        List the cards of a collection that were modified after the watermark with Guru's
+        card manager search, so the content of unchanged cards isn't downloaded.
+        Returns the search results, which only need their ID and lastModified time.
+        """
+        url = f"{source.base_url}/search/cardmgr"
+        data = {
+            "collectionIds": [collection_id],
+            "query": {
+                "type": "grouping",
+                "op": "AND",
+                "nestedExpressions": [{"type": "last-modified", "op": "GT", "value": watermark}],
+            },
+            "sorts": [{"type": "lastModified", "dir": "DESC"}],
+        }
+        auth = (environ["GURU_USER_EMAIL"], environ["GURU_USER_TOKEN"])
+
+        cards = []
+        while url:
+            with self.instrumentation.measure("guru search modified cards"):
+                response = self.session.post(url, json=data, auth=auth, timeout=20)
+            if not response.ok:
+                print(f"Failed to search for cards modified since {watermark}")
+                response.raise_for_status()
+
+            # The watermark is also checked here, in case the search doesn't filter by it
+            cards.extend(card for card in response.json() if (card.get("lastModified") or "") > watermark)
+            url = response.links.get("next-page", {}).get("url")
+
+        return cards
+
+    def find_modified_card_ids(self, collection_id: str):
+        """
+        Find the IDs of the cards of one collection that were modified since the last sync.
+        Returns the collection's ID and the card IDs, or None if the collection needs a full sync.
+        This runs on the read workers, so it must not call map_reads itself.
+        """
+        collection = self.get_collection(collection_id)
+        metadata = self.get_metadata(collection.id)
+        last_full_sync = metadata.get("last_full_sync")
+
+        if not last_full_sync or time.time() - last_full_sync > self.full_sync_interval:
+            return collection.id, None
+        if metadata.get("sync_details_digest") != self.get_details_digest(collection):
+            return collection.id, None
+
+        return collection.id, [
+            card["id"] for card in self.find_modified_cards(collection.id, metadata.get("sync_watermark", ""))
+        ]
+
+    def needs_full_sync(self, card: guru.Card) -> bool:
+        """
+        Check if a modified card changes what is published in a way only a full sync handles.
+        """
+        card_metadata = self.get_metadata(card.id)
+        if self.skip_unverified_cards and getattr(card, "verification_state", "TRUSTED") != "TRUSTED":
+            # The card was unverified, so its published file may have to be deleted
+            return bool(card_metadata)
+
+        # Added and moved cards can leave folders and files behind that only deletions remove
+        published_path = card_metadata.get("external_path")
+        return not published_path or path.dirname(published_path) != path.dirname(self.get_external_card_path(card))
+
+    def get_card(self, card_id: str) -> guru.Card:
+        with self.instrumentation.measure("guru get_card"):
+            return source.get_card(card_id)
+
+    def find_incremental_changes(self, collection_ids: List[str]):
+        """
+        Find the cards modified since the last sync without listing every card of every collection.
+        Returns the modified cards of each collection, or None if a full sync is needed: when
+        a collection hasn't been fully synced or its details changed, when cards were added,
+        moved, or unverified, or when it's time for the periodic full sync. Archived cards aren't
+        found by the search, so their files are deleted by the periodic full sync.
+        """
+        if not hasattr(self, "publish_card"):
+            print("The Guru SDK can't publish single cards, so every collection is synced")
+            return None
+
+        modified_card_ids = {}
+        for collection_id, card_ids in self.map_reads(self.find_modified_card_ids, collection_ids):
+            if card_ids is None:
+                print(f"Collection {collection_id} needs a full sync")
+                return None
+            modified_card_ids[collection_id] = card_ids
+
+        # The cards of every collection are fetched together, from the top level, so no read
+        # worker waits on reads queued behind it
+        card_ids = [card_id for collection_card_ids in modified_card_ids.values() for card_id in collection_card_ids]
+        cards = iter(self.map_reads(self.get_card, card_ids))
+        modified_cards = {
+            collection_id: [next(cards) for _ in collection_card_ids]
+            for collection_id, collection_card_ids in modified_card_ids.items()
+        }
+
+        for collection_id, collection_cards in modified_cards.items():
+            if any(self.needs_full_sync(card) for card in collection_cards):
+                print(f"Collection {collection_id} needs a full sync")
+                return None
+
+        return modified_cards
+
+    def publish_modified_cards(self, modified_cards: dict):
         """
+        Publish only the cards that were modified since the last sync, through the SDK
+        so each card is prepared the same way as in a full sync.
+        """
+        for collection_id, cards in modified_cards.items():
+            start_time = time.perf_counter()
+            for card in cards:
+                folder = card.folders[0] if card.folders else None
+                self.publish_card(card, folder=folder, collection=card.collection)
+            self.record_timing(collection_id, "publish", time.perf_counter() - start_time)
+
+    def needs_deletions(self, sync_states: dict) -> bool:
+        """
+        Check if cards were added, removed, moved, or unverified in any collection since the
+        last full sync. If they weren't, there is nothing to delete.
+        """
+        if not sync_states:
+            return True
+
+        return any(
+            self.get_metadata(collection_id).get("sync_digest") != sync_state["sync_digest"]
+            for collection_id, sync_state in sync_states.items()
+        )
+
+    def record_sync(self, sync_states: dict):
+        """
+        Record the state of each collection after a successful full sync in the metadata file.
+        """
+        for collection_id, sync_state in sync_states.items():
+            metadata = self.get_metadata(collection_id)
+            if metadata:
+                metadata.update(sync_state)
+                metadata["last_full_sync"] = time.time()
+
+    def record_incremental_sync(self, modified_cards: dict):
+        """
+        Move the watermark of each collection past the cards published by an incremental sync.
+        """
+        for collection_id, cards in modified_cards.items():
+            metadata = self.get_metadata(collection_id)
+            watermark = max(
+                [metadata.get("sync_watermark", "")] + [getattr(card, "last_modified", None) or "" for card in cards]
+            )
+            if metadata and metadata.get("sync_watermark") != watermark:
+                metadata["sync_watermark"] = watermark
+                self.journal.mark_changed(collection_id)
+
+    def load_metadata(self):
+        """
+        Load the metadata from the configured store. If it hasn't been stored in that
+        format yet, it's migrated from the first other format that has been used.
+        The store it's migrated from is removed once the metadata has been saved,
+        so switching back later migrates the latest metadata again.
+        """
+        metadata_stores = [self.metadata_store] + [
+            metadata_store_class()
+            for metadata_store_class in METADATA_STORES.values()
+            if not isinstance(self.metadata_store, metadata_store_class)
+        ]
+
+        for metadata_store in metadata_stores:
+            if metadata_store.exists():
+                if metadata_store is not self.metadata_store:
+                    print(f"Migrating metadata from {metadata_store.file_path} to {self.metadata_store.file_path}")
+                    self.migrated_metadata_store = metadata_store
+                metadata = metadata_store.load()
+                break
+        else:
+            return
+
+        # Keep the SDK's dictionary so anything holding a reference to it stays up to date
+        self._PublisherFolders__metadata.clear()
+        self._PublisherFolders__metadata.update(metadata)
+
+    def save_metadata(self):
+        """
+        Save the metadata to the configured store. Only changed records are written.
+        The journal is no longer needed once its changes are saved.
+        """
+        self.metadata_store.save(self._PublisherFolders__metadata)
+        self.journal.clear()
+
+        if self.migrated_metadata_store is not None:
+            self.remove_metadata_store(self.migrated_metadata_store)
+            self.migrated_metadata_store = None
+
+    def remove_metadata_store(self, metadata_store: MetadataStore):
+        """
+        Remove a store the metadata was migrated from, and stage its removal for commit.
+        """
+        print(f"Removing {metadata_store.file_path}, which was migrated to {self.metadata_store.file_path}")
+        self.run_git(["rm", "--quiet", "--ignore-unmatch", "--", metadata_store.file_path])
+        # Files that aren't tracked by Git aren't removed by `git rm`
+        if path.exists(metadata_store.file_path):
+            remove(metadata_store.file_path)
+
+    def flush_journal(self):
+        """
+        Journal the metadata changed by a completed GitHub write. While renames are staged
+        but not committed, the metadata already points to their new paths, so it's journaled
+        once they are committed. The git backend commits the metadata with the files it
+        describes, so it doesn't need the journal.
+        """
+        if not self.dry_run and not self.batched_changes and self.publish_backend == "rest":
+            self.journal.flush(self._PublisherFolders__metadata)
+
+    def _PublisherFolders__save_metadata(self, *args, **kwargs):
+        """
+        The SDK saves metadata with this method, so the configured store is used instead.
+        """
+        if not self.dry_run:
+            self.save_metadata()
+
+    def prefetch_card_content(self, collection):
+        """
+        Start rendering every card in a collection that changed since it was last published.
+        Results are picked up by convert_card_content when the SDK reaches each card.
+        """
+        for card in self.find_collection_cards(collection):
+            if card.id in self.rendered_cards:
+                continue
+            if self.skip_unverified_cards and getattr(card, "verification_state", "TRUSTED") != "TRUSTED":
+                # The SDK doesn't publish unverified cards
+                continue
+
+            metadata = self.get_metadata(card.id)
+            last_modified = getattr(card, "last_modified", None)
+            if (
+                last_modified
+                and last_modified == metadata.get("published_last_modified")
+                and metadata.get("published_content_format") == self.content_format
+            ):
+                # The card has not changed, so it will not need to be rendered
+                continue
+
+            self.rendered_cards[card.id] = self.card_executor.submit(
+                self.render_collection_card, collection, card
+            )
+
+    def render_collection_card(self, collection_id: str, card: guru.Card):
+        """
+        Render a card on a worker thread and record the time it took for its collection.
+        Returns the rendered content and images, and the digest of the document they were
+        rendered from, so convert_card_content can check that the SDK's card matches it.
+        """
+        start_time = time.perf_counter()
+        try:
+            doc_digest = self.get_doc_digest(card)
+            return (*self.render_card_content(card, self.image_staging_directory), doc_digest)
+        finally:
+            self.record_timing(collection_id, "render", time.perf_counter() - start_time)
+
+    def get_doc_digest(self, card: guru.Card) -> str:
+        """
+        Get a digest of a card's document, which changes if the SDK changes the document.
+        """
+        return hashlib.sha256(str(card.doc).encode()).hexdigest()
+
+    def discard_render(self, card_id: str):
+        """
+        Drop a card rendered ahead of time and delete the images it staged.
+        """
+        rendered_card = self.rendered_cards.pop(card_id, None)
+        if rendered_card is not None and not rendered_card.cancel():
+            # Wait for the render to finish so it doesn't stage images after they are deleted
+            wait([rendered_card])
+        shutil.rmtree(path.join(self.image_staging_directory, card_id), ignore_errors=True)
+
+    def discard_unused_renders(self, collection_id: str):
+        """
+        Drop the cards of a published collection that were rendered ahead of time but not updated
+        by the SDK. The SDK found their published files up to date, so their last modified time
+        is recorded and they aren't rendered ahead of time again until they change.
+        """
+        for card in self.find_collection_cards(collection_id):
+            if card.id not in self.rendered_cards:
+                continue
+
+            self.discard_render(card.id)
+            metadata = self.get_metadata(card.id)
+            last_modified = getattr(card, "last_modified", None)
+            if metadata and last_modified and metadata.get("published_last_modified") != last_modified:
+                metadata["published_last_modified"] = last_modified
+                self.journal.mark_changed(card.id)
+
+        self.flush_journal()
+
+    def shutdown_workers(self):
+        """
+        Stop the worker threads and remove images that were downloaded but never published.
+        """
+        if self.read_executor:
+            self.read_executor.shutdown(wait=True)
+            self.read_executor = None
+        if self.card_executor:
+            for future in self.rendered_cards.values():
+                future.cancel()
+            self.card_executor.shutdown(wait=True)
+            self.card_executor = None
+            self.rendered_cards = {}
+            shutil.rmtree(self.image_staging_directory, ignore_errors=True)
+
+    def record_card_published(self, card: guru.Card):
+        """
+        Record the last modified time and content format of a card once its file is written,
+        so unchanged cards are not rendered ahead of time or rewritten on the next run.
+        """
+        metadata = self.get_metadata(card.id)
+        last_modified = getattr(card, "last_modified", None)
+        if metadata and (
+            metadata.get("published_last_modified") != last_modified
+            or metadata.get("published_content_format") != self.content_format
+        ):
+            metadata["published_last_modified"] = last_modified
+            metadata["published_content_format"] = self.content_format
+            self.journal.mark_changed(card.id)
+
+        self.flush_journal()
+
+    @measured("render_card_content")
+    def render_card_content(self, card: guru.Card, image_staging_directory=None, download_images=True):
+        """
+        Convert card content to be more GitHub-flavored Markdown friendly and download its images.
+        Returns the content and a list of (downloaded path, repository path, manifest record)
+        tuples for its images. The downloaded path is None for images that did not change.
+
+        This may run on a worker thread, so it must not write to the repository or metadata.
+        Images are downloaded to the staging directory, if given, and moved into place later.
+        When images aren't downloaded, their manifest record only has their URL.
+        """
+        # Render the document the SDK prepared, so changes it made to the card's content are kept
         content: BeautifulSoup = card.doc
+        images = []
 
         # Replace iframes with links to their source
         for iframe in content.select("iframe"):
@@ -700,7 +3054,8 @@ class GitHubPublisher(guru.PublisherFolders):
             if src is not None:
                 iframe.replace_with(src)
 
-        # Download images and replace image URLs with local file paths
+        # Replace image URLs with local file paths, and download each image once
+        image_downloads = {}
         for image in content.select("img"):
             filename = image.attrs.get("data-ghq-card-content-image-filename")
             # We expect all images to have a filename
@@ -718,25 +3073,204 @@ class GitHubPublisher(guru.PublisherFolders):
             image_relative_path = f"resources/{filename}"
             image_absolute_path = f"{collection_path}/{image_relative_path}"
             image_download_path = f"{collection_name}/{image_relative_path}"
-            guru.download_file(
-                image.attrs.get("src"),
-                image_download_path,
-                headers={"Authorization": source._Guru__get_basic_auth_value()},
-            )
+
+            if image_staging_directory:
+                # Keep each card's images apart in case two cards use the same filename
+                downloaded_path = path.join(image_staging_directory, card.id, filename)
+            else:
+                downloaded_path = image_download_path
+
+            image_downloads.setdefault(downloaded_path, (image.attrs.get("src"), image_download_path))
             image.attrs["src"] = f"/{image_absolute_path}"
 
-            # Ensure the file extension is tracked by Git LFS
-            subprocess.run(
-                ["/usr/bin/git", "lfs", "track", f"*{file_extension}"], check=True
+        def download_image(downloaded_path: str):
+            url, image_download_path = image_downloads[downloaded_path]
+            if not download_images:
+                return {"url": url}, False
+            return self.download_image(url, downloaded_path, image_download_path)
+
+        # The images of a card are downloaded concurrently when a read concurrency is configured
+        results = self.map_reads(download_image, list(image_downloads))
+        for (downloaded_path, (_, image_download_path)), (record, downloaded) in zip(image_downloads.items(), results):
+            # Images that are already in the repository don't need to be moved or staged
+            images.append((downloaded_path if downloaded else None, image_download_path, record))
+
+        # Add a title to the content that links to the card in Guru
+        if self.content_format == "html":
+            body = content.prettify()
+        else:
+            body = self.markdown_converter.convert(content)
+
+        return f"# [{card.title}]({card.url})\n\n{body}", images
+
+    def hash_file(self, file_path: str) -> str:
+        """
+        Compute the SHA-256 hash of a file.
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(65536), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @measured("download_image")
+    def download_image(self, url: str, downloaded_path: str, image_download_path: str):
+        """
+        Download an image unless the copy in the repository is already up to date.
+        Returns the image's manifest record and whether new content was downloaded.
+
+        Images whose URL, size, and hash match the manifest are not requested at all.
+        Otherwise, the ETag and Last-Modified values from the last download are sent
+        so the server can respond with 304 Not Modified.
+        """
+        record = self.image_manifest.get(image_download_path)
+        local_sha256 = None
+        if path.exists(image_download_path):
+            if record is None or path.getsize(image_download_path) == record.get("size"):
+                local_sha256 = self.hash_file(image_download_path)
+
+        local_file_matches = record is not None and local_sha256 == record.get("sha256")
+        if local_file_matches and record.get("url") == url:
+            return record, False
+
+        headers = {"Authorization": source._Guru__get_basic_auth_value()}
+        if local_file_matches:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+
+        makedirs(path.dirname(downloaded_path), exist_ok=True)
+        with self.session.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 304:  # Not Modified
+                return {**record, "url": url}, False
+
+            if not response.ok:
+                print(f"Failed to download image: {image_download_path}")
+                response.raise_for_status()
+
+            content_hash = hashlib.sha256()
+            size = 0
+            with open(downloaded_path, "wb") as file:
+                for chunk in response.iter_content(chunk_size=65536):
+                    file.write(chunk)
+                    content_hash.update(chunk)
+                    size += len(chunk)
+
+        record = {
+            "url": url,
+            "size": size,
+            "sha256": content_hash.hexdigest(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+        if record["sha256"] == local_sha256:
+            # The image was downloaded again but its content is unchanged
+            if downloaded_path != image_download_path:
+                remove(downloaded_path)
+            return record, False
+
+        return record, True
+
+    def save_image_manifest(self):
+        """
+        Save the image manifest next to the metadata file.
+        """
+        with open(self.image_manifest_path, "w", encoding="utf-8") as file:
+            json.dump(self.image_manifest, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    def add_card_images(self, images):
+        """
+        Move downloaded images into the collection.
+        They are staged for commit all at once by stage_images.
+        """
+        for downloaded_path, image_download_path, record in images:
+            self.image_manifest[image_download_path] = record
+            if downloaded_path is None:
+                continue
+
+            if downloaded_path != image_download_path:
+                makedirs(path.dirname(image_download_path), exist_ok=True)
+                replace(downloaded_path, image_download_path)
+
+            self.unstaged_image_paths.add(image_download_path)
+
+    @measured("stage_images")
+    def stage_images(self):
+        """
+        Stage every image added during the run with one `git add`, after making sure
+        their file extensions are tracked by Git LFS with at most one `git lfs track`.
+        """
+        if not self.unstaged_image_paths:
+            return None
+
+        image_paths = sorted(self.unstaged_image_paths)
+
+        # Find the images whose extension isn't tracked by Git LFS yet
+        with self.instrumentation.measure("git check-attr"):
+            check_attr_process = subprocess.run(
+                ["/usr/bin/git", "check-attr", "-z", "--stdin", "filter"],
+                input="\0".join(image_paths) + "\0",
+                check=True,
+                text=True,
+                capture_output=True,
             )  # nosec B603
+        # Output is a sequence of <path> NUL <attribute> NUL <value> NUL
+        attributes = check_attr_process.stdout.split("\0")
+        untracked_extensions = sorted(
+            {
+                path.splitext(image_path)[1]
+                for image_path, value in zip(attributes[0::3], attributes[2::3])
+                if value != "lfs"
+            }
+        )
 
-            # Stage the file for commit
+        if untracked_extensions:
+            # Ensure the file extensions are tracked by Git LFS
+            with self.instrumentation.measure("git lfs track"):
+                subprocess.run(
+                    ["/usr/bin/git", "lfs", "track"]
+                    + [f"*{file_extension}" for file_extension in untracked_extensions],
+                    check=True,
+                )  # nosec B603
+
+        # Stage the files for commit
+        with self.instrumentation.measure("git add"):
             subprocess.run(
-                ["/usr/bin/git", "add", image_download_path], check=True
+                ["/usr/bin/git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                input="\0".join(image_paths) + "\0",
+                check=True,
+                text=True,
             )  # nosec B603
 
-        # Add a title to the content that links to the card in Guru
-        return f"# [{card.title}]({card.url})\n\n{content.prettify()}"
+        self.unstaged_image_paths = set()
+
+    @measured("convert_card_content")
+    def convert_card_content(self, card: guru.Card):
+        """
+        Convert card content to be more GitHub-flavored Markdown friendly.
+        Uses the content rendered ahead of time on a worker thread if it was
+        rendered from the same document as the card the SDK passed in.
+        """
+        rendered_card = self.rendered_cards.get(card.id)
+        if rendered_card is not None:
+            content, images, doc_digest = rendered_card.result()
+            if doc_digest != self.get_doc_digest(card):
+                # The SDK prepared the card's document differently, so its own card is rendered
+                self.discard_render(card.id)
+                rendered_card = None
+            else:
+                del self.rendered_cards[card.id]
+
+        if rendered_card is None:
+            content, images = self.render_card_content(card)
+
+        # Images are only moved here, one card at a time, in publishing order
+        self.add_card_images(images)
+
+        return content
 
     def create_external_card(
         self, card: guru.Card, changes, folder=None, collection=None
@@ -751,9 +3285,13 @@ class GitHubPublisher(guru.PublisherFolders):
         name = path.basename(card_path)
         content = self.convert_card_content(card)
 
-        return self.create_or_update_file_contents(
+        response = self.create_or_update_file_contents(
             card.id, card_path, f"Create {name}", content
         )
+        if response.ok:
+            self.record_card_published(card)
+
+        return response
 
     def update_external_card(
         self,
@@ -783,9 +3321,9 @@ class GitHubPublisher(guru.PublisherFolders):
         alt_card_path = f"{path.dirname(new_card_path)}/{old_card_name}"
 
         external_card_response = (
-            self.get_repository_content(new_card_path)
-            or self.get_repository_content(old_card_path)
-            or self.get_repository_content(alt_card_path)
+            self.get_indexed_content(new_card_path)
+            or self.get_indexed_content(old_card_path)
+            or self.get_indexed_content(alt_card_path)
         )
 
         if external_card_response.ok:
@@ -799,7 +3337,10 @@ class GitHubPublisher(guru.PublisherFolders):
             current_card_path
         )
 
-        if changes.content_changed or changes.folders_added or changes.folders_removed:
+        # Files published in another content format are rewritten even if the card didn't change
+        content_format_changed = card_metadata.get("published_content_format") != self.content_format
+
+        if changes.content_changed or changes.folders_added or changes.folders_removed or content_format_changed:
             old_parent_folder = path.basename(path.dirname(current_card_path))
             new_parent_folder = path.basename(path.dirname(new_card_path))
             parent_folder_changed = new_parent_folder != old_parent_folder
@@ -813,7 +3354,7 @@ class GitHubPublisher(guru.PublisherFolders):
             else:
                 commit_message = f"Update {new_card_name}"
 
-            new_card_path_available = not self.get_repository_content(new_card_path).ok
+            new_card_path_available = not self.get_indexed_content(new_card_path).ok
 
             if (
                 (card_path_changed or card_name_changed)
@@ -827,12 +3368,18 @@ class GitHubPublisher(guru.PublisherFolders):
                     commit_message,
                 )
 
-            return self.create_or_update_file_contents(
+            response = self.create_or_update_file_contents(
                 card.id,
                 new_card_path,
                 f"Update {new_card_name}",
                 self.convert_card_content(card),
             )
+            if response.ok:
+                self.record_card_published(card)
+
+            return response
+
+        self.record_card_published(card)
 
         return external_card_response
 
@@ -846,7 +3393,7 @@ class GitHubPublisher(guru.PublisherFolders):
         card_name = card_metadata["external_name"]
         card_path = card_metadata["external_path"]
 
-        external_card_response = self.get_repository_content(card_path)
+        external_card_response = self.get_indexed_content(card_path)
 
         if not external_card_response.ok:
             # Attempt to get the card path based on its blob SHA
@@ -859,6 +3406,69 @@ class GitHubPublisher(guru.PublisherFolders):
         return self.delete_a_file(card_path, f"Delete {card_name}", card_sha)
 
 
+def sync_collections(destination: GitHubPublisher, guru_collection_ids: List[str]):
+    """
+    Sync Guru collections to the GitHub repository.
+    """
+    # In incremental mode, only the cards modified since the last sync are read, unless a full sync is needed
+    modified_cards = None
+    if destination.incremental_sync and not destination.plan_only:
+        modified_cards = destination.find_incremental_changes(guru_collection_ids)
+
+    sync_states = {}
+    if modified_cards is None:
+        # Read the repository tree, the cards of every collection, and their folders at the same time
+        destination.prefetch_reads(guru_collection_ids)
+        if destination.incremental_sync and not destination.plan_only:
+            sync_states = dict(destination.map_reads(destination.get_sync_state, guru_collection_ids))
+
+    if destination.plan_only:
+        # Only report what a sync would change
+        destination.write_plan(destination.plan_sync(guru_collection_ids))
+    elif modified_cards is not None and not any(modified_cards.values()):
+        print("Nothing changed in Guru since the last sync")
+    else:
+        if modified_cards is not None:
+            print(f"Publishing {sum(map(len, modified_cards.values()))} cards modified since the last sync")
+            destination.publish_modified_cards(modified_cards)
+        else:
+            # Fetch and render every collection's cards on the worker threads,
+            # then publish Collection(s) one at a time
+            destination.prefetch_collections(guru_collection_ids)
+            for guru_collection_id in guru_collection_ids:
+                destination.publish_collection(guru_collection_id)
+
+            # Delete Markdown documents when their corresponding Guru
+            # cards are archived or removed from a folder or collection.
+            # Deletions are found by comparing every published object to the metadata,
+            # so they're only processed after every collection is published.
+            if destination.needs_deletions(sync_states):
+                destination.process_deletions()
+        destination.stage_images()
+
+        if destination.batch_commits and not destination.dry_run:
+            destination.commit_batched_changes("Sync Guru collections")
+        elif not destination.dry_run:
+            destination.commit_renames()
+
+        if not destination.dry_run:
+            destination.save_image_manifest()
+            if sync_states:
+                destination.record_sync(sync_states)
+            elif modified_cards:
+                destination.record_incremental_sync(modified_cards)
+            destination.save_metadata()
+
+            if destination.publish_backend == "git":
+                # Cards, images, and metadata are committed together and pushed once
+                destination.commit_and_push("Sync Guru collections")
+
+    destination.shutdown_workers()
+    print(destination.summarize_timings())
+    print(destination.session.summarize())
+    destination.write_instrumentation_report()
+
+
 if __name__ == "__main__":
     guru_user_email = environ["GURU_USER_EMAIL"]
     guru_user_token = environ["GURU_USER_TOKEN"]
@@ -869,10 +3479,4 @@ if __name__ == "__main__":
         id.strip() for id in environ["GURU_COLLECTION_IDS"].split(",")
     ]
 
-    # Publish Collection(s)
-    for guru_collection_id in guru_collection_ids:
-        destination.publish_collection(guru_collection_id)
-
-    # Delete Markdown documents when their corresponding Guru
-    # cards are archived or removed from a folder or collection
-    destination.process_deletions()
+    sync_collections(destination, guru_collection_ids)
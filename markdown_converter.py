@@ -0,0 +1,311 @@
+"""
+Convert Guru card content from HTML to GitHub-flavored Markdown.
+"""
+
+import re
+
+from bs4.element import Comment, Declaration, Doctype, NavigableString, ProcessingInstruction, Tag
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+ESCAPE_PATTERN = re.compile(r"([\\`*_\[\]<>])")
+# Text that would start a heading, list, or fence if it started a line
+BLOCK_MARKER_PATTERN = re.compile(r"^(\s*)(?:([#+\-=~])|(\d+)([.)]))")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~~)")
+LANGUAGE_CLASS_PATTERN = re.compile(r"^(?:language|lang)-(.+)$")
+CELL_EDGE_BREAKS_PATTERN = re.compile(r"^(?:<br>)+|(?:<br>)+$")
+REPEATED_BREAKS_PATTERN = re.compile(r"(?:<br>){2,}")
+
+
+def parse_integer(value, default: int) -> int:
+    """
+    Parse an integer HTML attribute, falling back to a default if it isn't a number.
+    """
+    value = str(value or "").strip()
+    return int(value) if value.isdigit() else default
+
+
+class MarkdownConverter:
+    """
+    Convert a BeautifulSoup document to GitHub-flavored Markdown in a single pass over the tree.
+    The same document always produces the same Markdown, so unchanged cards don't produce diffs.
+    """
+
+    def __init__(self):
+        self.block_handlers = {
+            "h1": self.convert_heading,
+            "h2": self.convert_heading,
+            "h3": self.convert_heading,
+            "h4": self.convert_heading,
+            "h5": self.convert_heading,
+            "h6": self.convert_heading,
+            "ul": self.convert_list,
+            "ol": self.convert_list,
+            "pre": self.convert_preformatted,
+            "blockquote": self.convert_blockquote,
+            "table": self.convert_table,
+            "hr": self.convert_horizontal_rule,
+        }
+        self.inline_handlers = {
+            "a": self.convert_link,
+            "img": self.convert_image,
+            "br": self.convert_line_break,
+            "code": self.convert_code,
+            "strong": self.convert_strong,
+            "b": self.convert_strong,
+            "em": self.convert_emphasis,
+            "i": self.convert_emphasis,
+            "del": self.convert_strikethrough,
+            "s": self.convert_strikethrough,
+            "strike": self.convert_strikethrough,
+        }
+        self.block_tags = frozenset(
+            [
+                "p",
+                "div",
+                "section",
+                "article",
+                "header",
+                "footer",
+                "main",
+                "aside",
+                "figure",
+                "figcaption",
+                "dl",
+                "dt",
+                "dd",
+                "li",
+            ]
+        )
+        self.ignored_tags = frozenset(["script", "style", "head", "title", "meta", "link"])
+
+    def convert(self, document) -> str:
+        """
+        Convert a document or element to Markdown.
+        """
+        markdown = self.convert_children(document, in_table=False)
+        lines = []
+        for line, in_fence in self.split_fenced_lines(markdown.strip()):
+            if not in_fence:
+                # Remove trailing whitespace and collapse repeated blank lines outside of code
+                line = line.rstrip()
+                if not line and lines and not lines[-1]:
+                    continue
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    def split_fenced_lines(self, markdown: str):
+        """
+        Split Markdown into lines, and tell whether each line is inside a fenced code block.
+        Fence lines themselves are not inside the block.
+        """
+        fence = None
+        for line in markdown.split("\n"):
+            match = FENCE_PATTERN.match(line)
+            if fence is None:
+                if match:
+                    fence = match.group(1)
+                yield line, False
+            elif line.strip() == fence:
+                fence = None
+                yield line, False
+            else:
+                yield line, True
+
+    def convert_children(self, element: Tag, in_table: bool) -> str:
+        return "".join(self.convert_node(child, in_table) for child in element.children)
+
+    def convert_node(self, node, in_table: bool) -> str:
+        if isinstance(node, (Comment, Declaration, Doctype, ProcessingInstruction)):
+            return ""
+        if isinstance(node, NavigableString):
+            text = WHITESPACE_PATTERN.sub(" ", str(node))
+            text = ESCAPE_PATTERN.sub(r"\\\1", text)
+            # Text may start a line, where it must not be read as a block marker
+            text = BLOCK_MARKER_PATTERN.sub(self.escape_block_marker, text)
+            return text.replace("|", "\\|") if in_table else text
+        if not isinstance(node, Tag) or node.name in self.ignored_tags:
+            return ""
+
+        block_handler = self.block_handlers.get(node.name)
+        if block_handler:
+            return block_handler(node, in_table)
+
+        inline_handler = self.inline_handlers.get(node.name)
+        if inline_handler:
+            return inline_handler(node, in_table)
+
+        content = self.convert_children(node, in_table)
+        if node.name in self.block_tags:
+            return self.wrap_block(content.strip(), in_table)
+
+        return content
+
+    def escape_block_marker(self, match) -> str:
+        whitespace, marker, number, delimiter = match.groups()
+        if marker:
+            return f"{whitespace}\\{marker}"
+        return f"{whitespace}{number}\\{delimiter}"
+
+    def wrap_block(self, content: str, in_table: bool) -> str:
+        """
+        Separate a block from its surroundings. Table cells can't contain
+        blank lines, so blocks in tables are separated by line breaks instead.
+        """
+        if not content:
+            return ""
+        if in_table:
+            return f"<br>{content}<br>"
+        return f"\n\n{content}\n\n"
+
+    def wrap_inline(self, content: str, marker: str) -> str:
+        """
+        Surround inline content with a marker, keeping its surrounding whitespace outside the marker.
+        """
+        stripped_content = content.strip()
+        if not stripped_content:
+            return content
+
+        leading_whitespace = content[: len(content) - len(content.lstrip())]
+        trailing_whitespace = content[len(content.rstrip()) :]
+        return f"{leading_whitespace}{marker}{stripped_content}{marker}{trailing_whitespace}"
+
+    def convert_heading(self, node: Tag, in_table: bool) -> str:
+        content = self.convert_children(node, in_table).strip().replace("\n", " ")
+        if in_table:
+            return self.wrap_block(f"**{content}**", in_table)
+        return self.wrap_block(f"{'#' * int(node.name[1])} {content}", in_table)
+
+    def convert_list(self, node: Tag, in_table: bool) -> str:
+        items = []
+        number = parse_integer(node.get("start"), 1)
+
+        for item in node.find_all("li", recursive=False):
+            marker = f"{number}. " if node.name == "ol" else "- "
+            number += 1
+
+            content = self.convert_children(item, in_table).strip()
+            # Keep lists tight by removing blank lines between the blocks in an item,
+            # but not the blank lines in code blocks
+            lines = [line for line, in_fence in self.split_fenced_lines(content) if in_fence or line.strip()]
+            if in_table:
+                items.append(f"{marker}{' '.join(lines)}")
+                continue
+
+            indentation = " " * len(marker)
+            items.append(
+                "\n".join(
+                    [f"{marker}{lines[0] if lines else ''}"]
+                    + [f"{indentation}{line}" if line else "" for line in lines[1:]]
+                )
+            )
+
+        if in_table:
+            return self.wrap_block("<br>".join(items), in_table)
+        return self.wrap_block("\n".join(items), in_table)
+
+    def convert_preformatted(self, node: Tag, in_table: bool) -> str:
+        if in_table:
+            return self.convert_code(node, in_table)
+
+        language = ""
+        for element in (node, node.find("code")):
+            if element is None:
+                continue
+            for class_name in element.get("class") or []:
+                match = LANGUAGE_CLASS_PATTERN.match(class_name)
+                if match:
+                    language = match.group(1)
+
+        text = node.get_text().strip("\n")
+        fence = "~~~~" if "```" in text else "```"
+        return f"\n\n{fence}{language}\n{text}\n{fence}\n\n"
+
+    def convert_blockquote(self, node: Tag, in_table: bool) -> str:
+        content = self.convert_children(node, in_table).strip()
+        if in_table:
+            return self.wrap_block(content, in_table)
+        return self.wrap_block(
+            "\n".join(f"> {line}" if line else ">" for line in content.split("\n")), in_table
+        )
+
+    def convert_horizontal_rule(self, node: Tag, in_table: bool) -> str:
+        return "<br>" if in_table else "\n\n---\n\n"
+
+    def convert_table(self, node: Tag, in_table: bool) -> str:
+        # Only rows that belong to this table, not to tables nested in it
+        rows = [row for row in node.find_all("tr") if row.find_parent("table") is node]
+        if not rows:
+            return ""
+
+        table = []
+        for row in rows:
+            cells = []
+            for cell in row.find_all(["th", "td"], recursive=False):
+                content = self.convert_children(cell, in_table=True).strip()
+                # Remove line breaks left at the start or end of the cell by blocks
+                content = CELL_EDGE_BREAKS_PATTERN.sub("", content)
+                content = REPEATED_BREAKS_PATTERN.sub("<br>", content).strip()
+                cells.append(content)
+                cells.extend([""] * (parse_integer(cell.get("colspan"), 1) - 1))
+            table.append(cells)
+
+        column_count = max(len(cells) for cells in table)
+        if not column_count:
+            return ""
+
+        lines = []
+        for index, cells in enumerate(table):
+            cells = cells + [""] * (column_count - len(cells))
+            lines.append(f"| {' | '.join(cells)} |")
+            if index == 0:
+                # The first row is used as the header
+                lines.append(f"|{'|'.join([' --- '] * column_count)}|")
+
+        if in_table:
+            # GitHub-flavored Markdown doesn't support nested tables
+            return self.wrap_block(" ".join(" ".join(cells) for cells in table), in_table)
+        return self.wrap_block("\n".join(lines), in_table)
+
+    def convert_link(self, node: Tag, in_table: bool) -> str:
+        content = self.convert_children(node, in_table)
+        href = node.get("href")
+        if not href:
+            return content
+
+        href = href.strip().replace(" ", "%20").replace("(", "%28").replace(")", "%29")
+        if not content.strip():
+            return f"<{href}>"
+        return self.wrap_inline(f"[{content.strip()}]({href})", "")
+
+    def convert_image(self, node: Tag, in_table: bool) -> str:
+        src = node.get("src")
+        if not src:
+            return ""
+
+        alt = WHITESPACE_PATTERN.sub(" ", node.get("alt") or "").strip()
+        alt = ESCAPE_PATTERN.sub(r"\\\1", alt)
+        src = src.strip().replace(" ", "%20").replace("(", "%28").replace(")", "%29")
+        return f"![{alt}]({src})"
+
+    def convert_line_break(self, node: Tag, in_table: bool) -> str:
+        return "<br>" if in_table else "<br>\n"
+
+    def convert_code(self, node: Tag, in_table: bool) -> str:
+        text = WHITESPACE_PATTERN.sub(" ", node.get_text())
+        if not text.strip():
+            return text
+
+        if in_table:
+            text = text.replace("|", "\\|")
+        fence = "``" if "`" in text else "`"
+        padding = " " if text.startswith("`") or text.endswith("`") else ""
+        return f"{fence}{padding}{text}{padding}{fence}"
+
+    def convert_strong(self, node: Tag, in_table: bool) -> str:
+        return self.wrap_inline(self.convert_children(node, in_table), "**")
+
+    def convert_emphasis(self, node: Tag, in_table: bool) -> str:
+        return self.wrap_inline(self.convert_children(node, in_table), "*")
+
+    def convert_strikethrough(self, node: Tag, in_table: bool) -> str:
+        return self.wrap_inline(self.convert_children(node, in_table), "~~")
@@ -0,0 +1,96 @@
+"""
+Tests for converting Guru card content from HTML to Markdown.
+Run with: python -m unittest test_markdown_converter
+"""
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from markdown_converter import MarkdownConverter
+
+# Each case is (name, HTML, expected Markdown)
+LIST_CASES = [
+    ("unordered", "<ul><li>a</li><li>b</li></ul>", "- a\n- b\n"),
+    ("ordered with start", "<ol start='3'><li>a</li><li>b</li></ol>", "3. a\n4. b\n"),
+    ("paragraphs in an item", "<ol><li><p>a</p><p>b</p></li></ol>", "1. a\n   b\n"),
+    ("nested", "<ul><li>a<ul><li>b</li></ul></li></ul>", "- a\n  - b\n"),
+]
+
+CODE_CASES = [
+    ("blank line in code in a list", "<ul><li>a<pre>x\n\ny</pre></li></ul>", "- a\n  ```\n  x\n\n  y\n  ```\n"),
+    (
+        "blank lines in code in a nested list",
+        "<ul><li>a<ul><li>b<pre>x\n\n\ny</pre></li></ul></li></ul>",
+        "- a\n  - b\n    ```\n    x\n\n\n    y\n    ```\n",
+    ),
+    ("repeated blank lines in code", "<pre>x\n\n\ny</pre>", "```\nx\n\n\ny\n```\n"),
+    ("trailing whitespace in code", "<pre>x  \ny</pre>", "```\nx  \ny\n```\n"),
+    ("language", "<pre><code class='language-bash'>echo</code></pre>", "```bash\necho\n```\n"),
+    ("fence in code", "<pre>```</pre>", "~~~~\n```\n~~~~\n"),
+    ("inline code", "<p>run <code>a_b</code></p>", "run `a_b`\n"),
+]
+
+TABLE_CASES = [
+    (
+        "header and body",
+        "<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>",
+        "| a | b |\n| --- | --- |\n| 1 | 2 |\n",
+    ),
+    (
+        "pipes and paragraphs in cells",
+        "<table><tr><td>a|b</td></tr><tr><td><p>c</p><p>d</p></td></tr></table>",
+        "| a\\|b |\n| --- |\n| c<br>d |\n",
+    ),
+    (
+        "colspan",
+        "<table><tr><td colspan='2'>a</td></tr><tr><td>1</td><td>2</td></tr></table>",
+        "| a |  |\n| --- | --- |\n| 1 | 2 |\n",
+    ),
+]
+
+ESCAPING_CASES = [
+    ("heading marker", "<p># not heading</p>", "\\# not heading\n"),
+    ("ordered list marker", "<p>1. not a list</p>", "1\\. not a list\n"),
+    ("ordered list parenthesis", "<p>2) not a list</p>", "2\\) not a list\n"),
+    ("unordered list markers", "<p>- a</p><p>+ b</p><p>* c</p>", "\\- a\n\n\\+ b\n\n\\* c\n"),
+    ("quote marker", "<p>&gt; not a quote</p>", "\\> not a quote\n"),
+    ("marker after a line break", "<p>a<br>- b</p>", "a<br>\n\\- b\n"),
+    ("inline characters", "<p>a_b *c* [d]</p>", "a\\_b \\*c\\* \\[d\\]\n"),
+    ("numbers that aren't markers", "<p>2024 was a year</p>", "2024 was a year\n"),
+]
+
+LINK_CASES = [
+    ("link", "<a href='https://example.com'>site</a>", "[site](https://example.com)\n"),
+    ("link without text", "<a href='https://example.com'></a>", "<https://example.com>\n"),
+    ("link without href", "<a>site</a>", "site\n"),
+    ("spaces and parentheses", "<a href='https://example.com/a (b)'>x</a>", "[x](https://example.com/a%20%28b%29)\n"),
+    ("image", "<img src='/a b.png' alt='an [image]'>", "![an \\[image\\]](/a%20b.png)\n"),
+]
+
+
+class MarkdownConverterTest(unittest.TestCase):
+    def assert_cases(self, cases):
+        converter = MarkdownConverter()
+        for name, html, expected in cases:
+            with self.subTest(name):
+                self.assertEqual(converter.convert(BeautifulSoup(html, "html.parser")), expected)
+
+    def test_lists(self):
+        self.assert_cases(LIST_CASES)
+
+    def test_code(self):
+        self.assert_cases(CODE_CASES)
+
+    def test_tables(self):
+        self.assert_cases(TABLE_CASES)
+
+    def test_escaping(self):
+        self.assert_cases(ESCAPING_CASES)
+
+    def test_links(self):
+        self.assert_cases(LINK_CASES)
+
+
+if __name__ == "__main__":
+    unittest.main()